@@ -0,0 +1,43 @@
+"""Compare deux fichiers de résultats : python -m benchmarks.compare avant.json après.json"""
+import json
+import sys
+
+METRICS = ('elapsed', 'files_per_s', 'mb_per_s', 'stat_calls', 'bytes_read', 'peak_rss')
+# Pour ces mesures, une hausse est une amélioration
+HIGHER_IS_BETTER = {'files_per_s', 'mb_per_s'}
+THRESHOLD = 0.10  # écart signalé au-delà de 10 %
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    return report, {result['scenario']: result for result in report['results']}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m benchmarks.compare avant.json après.json", file=sys.stderr)
+        return 2
+    (before_report, before), (after_report, after) = load(argv[0]), load(argv[1])
+    print(f"{(before_report.get('commit') or '?')[:10]} → {(after_report.get('commit') or '?')[:10]}"
+          f" (profil {after_report.get('profile')})")
+    regressions = 0
+    for scenario in after:
+        if scenario not in before:
+            continue
+        print(f"\n{scenario}")
+        for metric in METRICS:
+            old, new = before[scenario].get(metric), after[scenario].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            worse = change < -THRESHOLD if metric in HIGHER_IS_BETTER else change > THRESHOLD
+            regressions += worse
+            flag = "  ← régression" if worse else ""
+            print(f"  {metric:<12} {old:>14} {new:>14} {change:+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
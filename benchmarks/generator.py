@@ -0,0 +1,133 @@
+"""Arborescences de test reproductibles, à l'image d'un téléphone.
+
+Même profil et même graine : mêmes chemins, mêmes tailles, mêmes contenus et
+mêmes dates, d'une machine et d'un commit à l'autre.
+"""
+import json
+import os
+import random
+import shutil
+import struct
+from dataclasses import dataclass
+
+MiB = 1024 * 1024
+GiB = 1024 * MiB
+CHUNK = MiB
+STAMP_FILE = 'tree.json'
+BASE_MTIME = 1_700_000_000  # novembre 2023
+
+
+@dataclass
+class Profile:
+    screenshots: int  # nombreuses petites captures PNG
+    screenshot_size: tuple
+    photos: int  # JPEG de taille moyenne
+    photo_size: tuple
+    videos: int  # quelques très gros fichiers
+    video_size: tuple
+    nested: int  # fichiers rangés dans une arborescence profonde
+    depth: int
+    collisions: float  # part des fichiers déjà présents à la destination
+    different: float  # parmi eux, part dont le contenu diffère (même nom, même taille)
+
+
+PROFILES = {
+    'small': Profile(300, (20_000, 300_000), 60, (MiB, 5 * MiB), 2, (20 * MiB, 60 * MiB),
+                     100, 8, 0.1, 0.5),
+    'medium': Profile(5_000, (20_000, 400_000), 800, (MiB, 6 * MiB), 6, (200 * MiB, GiB),
+                      1_000, 12, 0.1, 0.5),
+    'large': Profile(20_000, (20_000, 400_000), 3_000, (MiB, 8 * MiB), 4, (2 * GiB, 4 * GiB),
+                     5_000, 16, 0.1, 0.5),
+}
+
+
+@dataclass
+class TreeFile:
+    relpath: str
+    size: int
+    mtime: int
+    seed: int
+
+
+def plan_tree(profile, seed=0):
+    """Liste des fichiers source d'un profil, sans rien écrire."""
+    rng = random.Random(seed)
+    files = []
+
+    def add(relpath, size_range):
+        files.append(TreeFile(relpath, rng.randint(*size_range),
+                              BASE_MTIME + len(files) * 37, rng.getrandbits(64)))
+
+    for i in range(profile.screenshots):
+        add(f"Pictures/Screenshots/Screenshot_{i:06d}.png", profile.screenshot_size)
+    for i in range(profile.photos):
+        add(f"DCIM/Camera/IMG_{i:06d}.jpg", profile.photo_size)
+    for i in range(profile.videos):
+        add(f"DCIM/Camera/VID_{i:06d}.mp4", profile.video_size)
+    for i in range(profile.nested):
+        # Une branche par groupe de fichiers, descendant jusqu'à `depth` niveaux
+        levels = 1 + i % profile.depth
+        folder = "/".join(f"d{(i // profile.depth) % 10}_{level}" for level in range(levels))
+        add(f"Android/media/com.whatsapp/{folder}/IMG-{i:06d}.jpg", profile.screenshot_size)
+    return files
+
+
+def write_file(path, size, seed, mtime):
+    # Un bloc aléatoire par fichier, numéroté à chaque MiB : aucun bloc n'est répété
+    block = random.Random(seed).randbytes(min(size, CHUNK))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        written = 0
+        number = 0
+        while written < size:
+            chunk = block[:size - written]
+            if number:
+                chunk = struct.pack('<Q', number)[:len(chunk)] + chunk[8:]
+            f.write(chunk)
+            written += len(chunk)
+            number += 1
+    os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+
+
+def generate_source(root, profile_name, seed=0):
+    """Écrit root/src, sauf si une arborescence identique y est déjà ; renvoie ses fichiers."""
+    files = plan_tree(PROFILES[profile_name], seed)
+    source = os.path.join(root, 'src')
+    stamp_path = os.path.join(root, STAMP_FILE)
+    stamp = {'profile': profile_name, 'seed': seed, 'files': len(files)}
+    try:
+        with open(stamp_path, encoding='utf-8') as f:
+            if json.load(f) == stamp:
+                return files
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(source, ignore_errors=True)
+    for tree_file in files:
+        write_file(os.path.join(source, tree_file.relpath), tree_file.size,
+                   tree_file.seed, tree_file.mtime)
+    with open(stamp_path, 'w', encoding='utf-8') as f:
+        json.dump(stamp, f)
+    return files
+
+
+def populate_destination(root, files, collisions, different, seed=0):
+    """Recrée root/dst avec une part `collisions` des fichiers source déjà présents.
+
+    Une part `different` de ces collisions a le même nom et la même taille mais un
+    autre contenu, et donne lieu à une copie renommée.
+    """
+    source = os.path.join(root, 'src')
+    destination = os.path.join(root, 'dst')
+    shutil.rmtree(destination, ignore_errors=True)
+    os.makedirs(destination)
+    rng = random.Random(seed + 1)
+    for tree_file in files:
+        if rng.random() >= collisions:
+            continue
+        path = os.path.join(destination, tree_file.relpath)
+        if rng.random() < different:
+            write_file(path, tree_file.size, tree_file.seed + 1, tree_file.mtime)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copy2(os.path.join(source, tree_file.relpath), path)
+    return destination
@@ -0,0 +1,186 @@
+"""Compteurs d'appels au système de fichiers et d'entrées/sorties du processus."""
+import builtins
+import os
+import threading
+from collections import Counter
+
+
+def _io_counters():
+    # rchar/wchar comptent aussi sendfile et copy_file_range, contrairement à un simple read()
+    counters = {}
+    try:
+        with open('/proc/self/io', encoding='ascii') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                counters[name] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def reset_peak_rss():
+    """Remet à zéro le pic de mémoire (Linux ≥ 4.0), pour ne mesurer que la suite."""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss():
+    """Pic de mémoire résidente du processus, en octets (None si inconnu)."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        # Windows : ni /proc ni resource
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Entry:
+    # DirEntry ne se laisse pas modifier : enveloppe pour compter ses stat()
+    __slots__ = ('_entry', '_record')
+
+    def __init__(self, entry, record):
+        self._entry = entry
+        self._record = record
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+    def stat(self, *, follow_symlinks=True):
+        self._record('entry_stat', self._entry.path)
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _ScandirIterator:
+    def __init__(self, iterator, record):
+        self._iterator = iterator
+        self._record = record
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        entry = next(self._iterator)
+        self._record('entry', entry.path)
+        return _Entry(entry, self._record)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._iterator.close()
+
+
+class FilesystemHooks:
+    """Remplace les fonctions de `os` utilisées par le moteur par des versions instrumentées.
+
+    `hook(op, path)` est appelé avant chaque opération (stat, lstat, listdir,
+    scandir, open), puis pour chaque entrée listée ('entry') et chaque stat
+    d'entrée ('entry_stat') ; `opened(file, path)` reçoit chaque fichier ouvert
+    par open() et peut l'envelopper. Les sous-classes s'en servent pour compter
+    ou pour ralentir les appels. À utiliser comme gestionnaire de contexte : les
+    fonctions d'origine sont rétablies à la sortie, dans l'ordre inverse.
+    """
+
+    def __init__(self):
+        self._saved = []
+
+    def hook(self, op, path):
+        pass
+
+    def opened(self, file, path):
+        return file
+
+    def patch(self, module, name, replacement):
+        original = getattr(module, name)
+        self._saved.append((module, name, original))
+        setattr(module, name, replacement)
+        return original
+
+    def _wrap(self, name):
+        original = getattr(os, name)
+
+        def wrapper(path, *args, **kwargs):
+            self.hook(name, path)
+            return original(path, *args, **kwargs)
+        return wrapper
+
+    def install(self):
+        for name in ('stat', 'lstat', 'open'):
+            self.patch(os, name, self._wrap(name))
+        listdir = os.listdir
+        scandir = os.scandir
+        builtin_open = builtins.open
+
+        def wrapped_listdir(path='.'):
+            self.hook('listdir', path)
+            names = listdir(path)
+            for name in names:
+                self.hook('entry', os.path.join(path, name))
+            return names
+
+        def wrapped_scandir(path='.'):
+            self.hook('scandir', path)
+            return _ScandirIterator(scandir(path), self.hook)
+
+        def wrapped_open(file, *args, **kwargs):
+            self.hook('open', file)
+            return self.opened(builtin_open(file, *args, **kwargs), file)
+
+        self.patch(os, 'listdir', wrapped_listdir)
+        self.patch(os, 'scandir', wrapped_scandir)
+        self.patch(builtins, 'open', wrapped_open)
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        while self._saved:
+            module, name, original = self._saved.pop()
+            setattr(module, name, original)
+
+
+class FilesystemProbe(FilesystemHooks):
+    """Compte les appels au système de fichiers et les octets lus et écrits."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._io = {}
+
+    def hook(self, op, path):
+        with self._lock:
+            self.calls[op] += 1
+
+    def __enter__(self):
+        self._io = _io_counters()
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        io = _io_counters()
+        self.bytes_read = io.get('rchar', 0) - self._io.get('rchar', 0)
+        self.bytes_written = io.get('wchar', 0) - self._io.get('wchar', 0)
+        self.read_syscalls = io.get('syscr', 0) - self._io.get('syscr', 0)
+        self.write_syscalls = io.get('syscw', 0) - self._io.get('syscw', 0)
+
+    @property
+    def stat_calls(self):
+        return self.calls['stat'] + self.calls['lstat'] + self.calls['entry_stat']
@@ -0,0 +1,215 @@
+"""Mesures de performance de la synchronisation : python -m benchmarks.run
+
+Chaque scénario est exécuté dans un processus neuf (pic mémoire propre, aucun
+cache Python partagé) sur une arborescence générée par benchmarks.generator.
+Les résultats sont écrits en JSON pour être comparés d'un commit à l'autre
+avec python -m benchmarks.compare.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.generator import PROFILES, generate_source, populate_destination
+from benchmarks.probe import FilesystemHooks, FilesystemProbe, peak_rss, reset_peak_rss
+from benchmarks.slowfs import DEVICE_PROFILES, SlowFilesystem
+from src.models.folder_pair import COMPARE_MODES, DEFAULT_COMPARE_MODE, FolderPair
+from src.utils.sync_engine import SyncEngine
+
+SCENARIOS = {
+    'first': "première synchronisation, quelques collisions à la destination",
+    'noop': "resynchronisation sans aucun changement",
+    'collisions': "tous les fichiers déjà présents à la destination, une partie différente",
+}
+DEFAULT_ROOT = os.path.join(tempfile.gettempdir(), 'sync-bench')
+
+
+def evict(root):
+    """Sort les fichiers de `root` du cache de pages, sans droits administrateur."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for directory, _, names in os.walk(root):
+        for name in names:
+            try:
+                fd = os.open(os.path.join(directory, name), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def make_engine(args, root, **callbacks):
+    state = os.path.join(root, 'state')
+    mapping = FolderPair(os.path.join(root, 'src'), os.path.join(root, 'dst'),
+                         compare_mode=args.compare_mode)
+    return SyncEngine([mapping], index_path=os.path.join(state, 'index.db'),
+                      manifest_dir=os.path.join(state, 'manifests'),
+                      hash_workers=args.hash_workers, incremental=not args.full, **callbacks)
+
+
+def prepare(args, scenario, files):
+    root = args.root
+    profile = PROFILES[args.profile]
+    shutil.rmtree(os.path.join(root, 'state'), ignore_errors=True)
+    os.makedirs(os.path.join(root, 'state'))
+    if scenario == 'collisions':
+        populate_destination(root, files, 1.0, profile.different, args.seed)
+    else:
+        populate_destination(root, files, profile.collisions, profile.different, args.seed)
+    if scenario == 'noop':
+        # Passage non mesuré : la destination et l'état sont à jour
+        make_engine(args, root).run()
+
+
+def measure(args, scenario):
+    files = generate_source(args.root, args.profile, args.seed)
+    prepare(args, scenario, files)
+    if not args.warm:
+        evict(args.root)
+
+    counts = Counter()
+    overall = []
+
+    def on_log_entries(entries):
+        counts.update(entry['type'] for entry in entries)
+
+    engine = make_engine(args, args.root, on_log_entries=on_log_entries,
+                         on_overall_progress=overall.append)
+    # La source joue le téléphone : seuls ses accès sont ralentis
+    device = SlowFilesystem(DEVICE_PROFILES[args.device], [os.path.join(args.root, 'src')], args.seed) \
+        if args.device else FilesystemHooks()
+    reset_peak_rss()
+    with device, FilesystemProbe() as probe:
+        start = time.perf_counter()
+        engine.run()
+        elapsed = time.perf_counter() - start
+    progress = overall[-1] if overall else None
+    scanned = progress.total if progress else 0
+    scanned_bytes = progress.bytes_total if progress else 0
+    return {
+        'scenario': scenario,
+        'elapsed': round(elapsed, 4),
+        'files': scanned,
+        'bytes': scanned_bytes,
+        'files_per_s': round(scanned / elapsed, 1),
+        'mb_per_s': round(scanned_bytes / elapsed / 1e6, 2),
+        'copy_mb_per_s': round(probe.bytes_written / elapsed / 1e6, 2),
+        'stat_calls': probe.stat_calls,
+        'calls': dict(probe.calls),
+        'bytes_read': probe.bytes_read,
+        'bytes_written': probe.bytes_written,
+        'read_syscalls': probe.read_syscalls,
+        'write_syscalls': probe.write_syscalls,
+        'peak_rss': peak_rss(),
+        'counts': dict(counts),
+        'disconnects': getattr(device, 'disconnects', 0),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description="Mesure la synchronisation sur une arborescence synthétique reproductible."
+    )
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small',
+                        help="taille de l'arborescence générée (large : plusieurs Go)")
+    parser.add_argument('--seed', type=int, default=0, help="graine du générateur")
+    parser.add_argument('--root', default=DEFAULT_ROOT,
+                        help="dossier de travail, l'arborescence source y est gardée d'un lancement à l'autre")
+    parser.add_argument('--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--compare-mode', choices=COMPARE_MODES, default=DEFAULT_COMPARE_MODE)
+    parser.add_argument('--hash-workers', type=int, default=0)
+    parser.add_argument('--device', choices=sorted(DEVICE_PROFILES),
+                        help="simule une source lente (téléphone en MTP, carte SD, partage réseau)")
+    parser.add_argument('--full', action='store_true', help="désactive le passage incrémental")
+    parser.add_argument('--warm', action='store_true',
+                        help="garde les fichiers en cache au lieu de les en sortir avant chaque mesure")
+    parser.add_argument('--output', help="fichier JSON des résultats (défaut : sortie standard)")
+    parser.add_argument('--child', choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    return parser
+
+
+def child_args(args):
+    forwarded = ['--profile', args.profile, '--seed', str(args.seed), '--root', args.root,
+                 '--compare-mode', args.compare_mode, '--hash-workers', str(args.hash_workers)]
+    if args.device:
+        forwarded += ['--device', args.device]
+    if args.full:
+        forwarded.append('--full')
+    if args.warm:
+        forwarded.append('--warm')
+    return forwarded
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.root = os.path.abspath(args.root)
+    if args.child:
+        json.dump(measure(args, args.child), sys.stdout)
+        return 0
+
+    print(f"Génération de l'arborescence '{args.profile}' dans {args.root}...", file=sys.stderr)
+    os.makedirs(args.root, exist_ok=True)
+    generate_source(args.root, args.profile, args.seed)
+    results = []
+    for scenario in args.scenario:
+        print(f"{scenario}: {SCENARIOS[scenario]}", file=sys.stderr)
+        child = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run', '--child', scenario] + child_args(args),
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        if child.returncode != 0:
+            print(child.stderr, file=sys.stderr)
+            return 1
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"  {result['elapsed']:.2f} s, {result['files_per_s']} fichiers/s, "
+              f"{result['mb_per_s']} Mo/s, {result['stat_calls']} stat", file=sys.stderr)
+        results.append(result)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'profile': args.profile,
+        'seed': args.seed,
+        'compare_mode': args.compare_mode,
+        'hash_workers': args.hash_workers,
+        'device': args.device,
+        'incremental': not args.full,
+        'warm': args.warm,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
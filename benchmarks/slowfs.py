@@ -0,0 +1,213 @@
+"""Système de fichiers lent simulé, pour reproduire un téléphone en MTP sur un disque local.
+
+Les appels du moteur (stat, listdir/scandir, open, lectures et écritures,
+copies noyau — donc aussi os.path.exists et shutil.copy2) qui visent les
+dossiers simulés subissent une latence par opération, un débit plafonné, une
+gigue et des déconnexions aléatoires, selon un profil de périphérique.
+"""
+import errno
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from benchmarks.probe import FilesystemHooks
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MB = 1000 * 1000
+
+
+@dataclass
+class DeviceProfile:
+    latency: float  # secondes par opération sur les métadonnées (stat, listage)
+    open_latency: float  # secondes par ouverture de fichier
+    entry_latency: float  # secondes par entrée d'un listage de dossier
+    bandwidth: float  # octets/s, partagés par toutes les lectures et écritures
+    jitter: float = 0.0  # variation aléatoire des latences, en fraction (0.3 : ±30 %)
+    serialize: bool = False  # une seule requête à la fois, comme une session MTP
+    disconnect_rate: float = 0.0  # probabilité de déconnexion à chaque opération
+    outage: float = 0.0  # durée pendant laquelle tout échoue après une déconnexion
+
+
+DEVICE_PROFILES = {
+    'mtp-usb2': DeviceProfile(0.004, 0.010, 0.0005, 25 * MB, jitter=0.3, serialize=True),
+    'mtp-usb3': DeviceProfile(0.002, 0.005, 0.0002, 80 * MB, jitter=0.2, serialize=True),
+    'mtp-flaky': DeviceProfile(0.004, 0.010, 0.0005, 25 * MB, jitter=0.5, serialize=True,
+                               disconnect_rate=0.001, outage=2.0),
+    'sdcard': DeviceProfile(0.0003, 0.0005, 0.00002, 60 * MB, jitter=0.1),
+    'smb': DeviceProfile(0.001, 0.002, 0.00005, 110 * MB, jitter=0.2),
+}
+
+
+class _SlowFile:
+    # Enveloppe d'un fichier ouvert : chaque octet lu ou écrit passe par le lien simulé
+    def __init__(self, file, filesystem, path):
+        self._file = file
+        self._filesystem = filesystem
+        self._path = path
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+    def __iter__(self):
+        for line in self._file:
+            self._filesystem.transfer(self._path, len(line))
+            yield line
+
+    def read(self, *args):
+        data = self._file.read(*args)
+        self._filesystem.transfer(self._path, len(data) if data else 0)
+        return data
+
+    def readinto(self, buffer):
+        n = self._file.readinto(buffer)
+        self._filesystem.transfer(self._path, n or 0)
+        return n
+
+    def write(self, data):
+        n = self._file.write(data)
+        self._filesystem.transfer(self._path, n or 0)
+        return n
+
+
+class SlowFilesystem(FilesystemHooks):
+    """Ralentit les accès aux dossiers `roots` selon un DeviceProfile.
+
+    La bande passante est une ressource unique : des lectures parallèles se la
+    partagent. Avec `serialize`, les latences s'additionnent aussi, comme sur
+    un téléphone qui ne traite qu'une requête MTP à la fois. Le générateur
+    aléatoire est initialisé par `seed` : gigue et déconnexions sont reproductibles.
+    """
+
+    def __init__(self, profile, roots, seed=0):
+        super().__init__()
+        self.profile = profile
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.disconnects = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._busy_until = 0.0
+        self._down_until = 0.0
+        self._fds = set()  # descripteurs ouverts par os.open dans les dossiers simulés
+
+    def covers(self, path):
+        if isinstance(path, int):
+            return path in self._fds
+        try:
+            path = os.fsdecode(os.fspath(path))
+        except TypeError:
+            return False
+        return any(path == root or path.startswith(root + os.sep) for root in self.roots)
+
+    def _wait(self, duration, shared):
+        if duration <= 0:
+            return
+        now = time.monotonic()
+        if shared:
+            with self._lock:
+                start = max(now, self._busy_until)
+                self._busy_until = start + duration
+                end = self._busy_until
+        else:
+            end = now + duration
+        time.sleep(max(0.0, end - now))
+
+    def _check_connected(self, path):
+        profile = self.profile
+        with self._lock:
+            now = time.monotonic()
+            down = now < self._down_until
+            if not down and profile.disconnect_rate and self._random.random() < profile.disconnect_rate:
+                self.disconnects += 1
+                self._down_until = now + profile.outage
+                down = True
+        if down:
+            raise OSError(errno.EIO, "Périphérique déconnecté (simulation)", str(path))
+
+    def _latency(self, seconds):
+        if self.profile.jitter:
+            with self._lock:
+                seconds *= 1 + self._random.uniform(-self.profile.jitter, self.profile.jitter)
+        self._wait(seconds, self.profile.serialize)
+
+    def hook(self, op, path):
+        if not self.covers(path):
+            return
+        self._check_connected(path)
+        profile = self.profile
+        if op == 'open':
+            # open() sur un descripteur déjà ouvert par os.open ne coûte rien de plus
+            if not isinstance(path, int):
+                self._latency(profile.open_latency)
+        elif op == 'entry':
+            self._latency(profile.entry_latency)
+        elif op != 'entry_stat':
+            # Les attributs d'une entrée arrivent avec le listage, comme en MTP
+            self._latency(profile.latency)
+
+    def transfer(self, path, nbytes):
+        if nbytes <= 0:
+            return
+        self._check_connected(path)
+        self._wait(nbytes / self.profile.bandwidth, True)
+
+    def opened(self, file, path):
+        if not self.covers(path):
+            return file
+        return _SlowFile(file, self, path)
+
+    def install(self):
+        super().install()
+        os_open = os.open
+        os_close = os.close
+        copy_file_range = getattr(os, 'copy_file_range', None)
+        sendfile = getattr(os, 'sendfile', None)
+
+        def slow_open(path, *args, **kwargs):
+            fd = os_open(path, *args, **kwargs)
+            if self.covers(path):
+                self._fds.add(fd)
+            return fd
+
+        def slow_close(fd):
+            self._fds.discard(fd)
+            return os_close(fd)
+
+        def slow_copy_file_range(src, dst, count, *args):
+            n = copy_file_range(src, dst, count, *args)
+            if self.covers(src) or self.covers(dst):
+                self.transfer(src, n)
+            return n
+
+        def slow_sendfile(out_fd, in_fd, *args):
+            n = sendfile(out_fd, in_fd, *args)
+            if self.covers(in_fd) or self.covers(out_fd):
+                self.transfer(in_fd, n)
+            return n
+
+        self.patch(os, 'open', slow_open)
+        self.patch(os, 'close', slow_close)
+        if copy_file_range is not None:
+            self.patch(os, 'copy_file_range', slow_copy_file_range)
+        if sendfile is not None:
+            self.patch(os, 'sendfile', slow_sendfile)
+        if fcntl is not None:
+            ioctl = fcntl.ioctl
+
+            def slow_ioctl(fd, request, arg=0, *args):
+                # Pas de partage de blocs (reflink) entre un téléphone et un disque
+                if self.covers(fd) or (isinstance(arg, int) and self.covers(arg)):
+                    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+                return ioctl(fd, request, arg, *args)
+            self.patch(fcntl, 'ioctl', slow_ioctl)
@@ -0,0 +1,215 @@
+"""Synchronisation sans interface graphique : python -m src.cli
+
+N'importe jamais PyQt6, pour un démarrage rapide depuis cron ou un timer systemd.
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from .utils.config import load_mappings, validate_mappings
+from .utils.progress import format_progress
+
+EXIT_OK = 0
+EXIT_SYNC_ERRORS = 1  # la synchronisation a abouti avec des erreurs de fichiers ou de mappings
+EXIT_CONFIG_ERROR = 2  # configuration absente ou invalide (même code qu'argparse)
+EXIT_CANCELLED = 130  # interrompue par Ctrl+C ; --resume reprend où elle s'est arrêtée
+
+
+class CliReporter:
+    def __init__(self, quiet=False, stream=sys.stderr, interval=1.0):
+        self.quiet = quiet
+        self.stream = stream
+        self.interval = interval
+        self.tty = stream.isatty()
+        self.counts = {}
+        self.mapping_status = {}
+        self.errors = []
+        self.last_overall = None
+        self._last_print = 0.0
+        self._lock = threading.Lock()
+
+    def on_log_entries(self, entries):
+        with self._lock:
+            for entry in entries:
+                self.counts[entry['type']] = self.counts.get(entry['type'], 0) + 1
+                if entry['type'] == 'error':
+                    self.errors.append(entry)
+                    if not self.quiet:
+                        self.stream.write(f"\nERREUR: {entry['source']}: {entry['error']}\n")
+
+    def on_progress(self, idx, progress):
+        if progress.status in ('completed', 'error'):
+            with self._lock:
+                self.mapping_status[idx] = progress.status
+
+    def on_overall_progress(self, progress):
+        with self._lock:
+            self.last_overall = progress
+            now = time.monotonic()
+            if self.quiet or (now - self._last_print < self.interval and progress.status != 'completed'):
+                return
+            self._last_print = now
+            if self.tty:
+                self.stream.write(f"\r\033[K{format_progress(progress)}")
+            else:
+                self.stream.write(format_progress(progress) + "\n")
+            self.stream.flush()
+
+    def summary(self, mappings, run_id, elapsed):
+        overall = self.last_overall
+        return {
+            'run_id': run_id,
+            'elapsed': round(elapsed, 3),
+            'files': overall.current if overall else 0,
+            'bytes': overall.bytes_total if overall else 0,
+            'counts': self.counts,
+            'errors': len(self.errors),
+            'mappings': [
+                {
+                    'source': m.source,
+                    'destination': m.destination,
+                    'status': self.mapping_status.get(i, 'pending')
+                }
+                for i, m in enumerate(mappings)
+            ]
+        }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description="Synchronise les mappings enregistrés sans lancer l'interface graphique."
+    )
+    parser.add_argument('--config', help="fichier de mappings (défaut : ~/.sync_smartphone/mappings.json)")
+    parser.add_argument('--json', action='store_true', help="affiche le résumé en JSON sur la sortie standard")
+    parser.add_argument('--quiet', action='store_true', help="n'affiche pas la progression")
+    parser.add_argument('--workers', type=int, default=4, help="mappings traités en parallèle")
+    parser.add_argument('--hash-workers', type=int, default=0,
+                        help="hachage en parallèle des fichiers à comparer (0 : désactivé)")
+    parser.add_argument('--verify', choices=('none', 'sample', 'full'), default='none',
+                        help="relecture de contrôle des copies : aucune, blocs échantillonnés ou complète")
+    parser.add_argument('--full', action='store_true',
+                        help="réexamine tous les fichiers, même ceux inchangés depuis le dernier passage")
+    parser.add_argument('--watch', action='store_true',
+                        help="reste actif et synchronise les nouveaux fichiers au fil de l'eau (Ctrl+C pour arrêter)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="analyse sans rien copier : fichiers par catégorie, octets à copier et espace libre")
+    parser.add_argument('--plan', metavar='FICHIER',
+                        help="avec --dry-run, enregistre le plan détaillé au format JSON dans ce fichier")
+    parser.add_argument('--resume', action='store_true',
+                        help="reprend la synchronisation interrompue au lieu de tout reprendre")
+    parser.add_argument('--no-journal', action='store_true', help="n'écrit pas dans le journal persistant")
+    return parser
+
+
+def dry_run(args, mappings, plan):
+    from .utils.sync_engine import SyncEngine
+
+    SyncEngine(mappings, max_workers=args.workers, hash_workers=args.hash_workers,
+               incremental=not args.full, dry_run=plan).run()
+    if args.plan:
+        plan.save_json(args.plan)
+    if args.json:
+        json.dump(plan.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(plan.summary())
+    problems = plan.preflight()
+    for problem in problems:
+        print(f"ERREUR: {problem}", file=sys.stderr)
+    failed = problems or any(plan.errors.values())
+    return EXIT_SYNC_ERRORS if failed else EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        mappings = load_mappings(args.config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erreur lors du chargement des mappings: {e}", file=sys.stderr)
+        return EXIT_CONFIG_ERROR
+    if not mappings:
+        print("Aucun mapping configuré.", file=sys.stderr)
+        return EXIT_CONFIG_ERROR
+    invalid_mappings = validate_mappings(mappings)
+    if invalid_mappings:
+        print("Erreurs dans les mappings:\n" + "\n".join(invalid_mappings), file=sys.stderr)
+        return EXIT_CONFIG_ERROR
+
+    # Imports différés : rien de lourd n'est chargé pour --help ou une configuration invalide
+    from .utils.control import SyncControl
+    from .utils.journal import SyncJournal
+    from .utils.planner import SyncPlan
+    from .utils.run_state import RunState
+    from .utils.sync_engine import SyncEngine
+    from .utils.watcher import SyncWatcher
+
+    if args.dry_run:
+        return dry_run(args, mappings, SyncPlan(mappings))
+
+    journal = None if args.no_journal else SyncJournal()
+    run_state = RunState.load()
+    if not args.resume:
+        run_state.clear()
+    reporter = CliReporter(quiet=args.quiet)
+    control = SyncControl()
+
+    def make_engine(changes=None):
+        return SyncEngine(
+            mappings,
+            max_workers=args.workers,
+            verify=args.verify,
+            hash_workers=args.hash_workers,
+            control=control,
+            # Les passages partiels de la surveillance ne touchent pas à l'état de reprise
+            run_state=run_state if changes is None else None,
+            incremental=not args.full,
+            changes=changes,
+            journal=journal,
+            on_progress=reporter.on_progress,
+            on_overall_progress=reporter.on_overall_progress,
+            on_log_entries=reporter.on_log_entries
+        )
+
+    # Ctrl+C : arrêt propre au prochain bloc, l'état de reprise reste enregistré
+    signal.signal(signal.SIGINT, lambda signum, frame: control.cancel())
+    watcher = SyncWatcher(mappings, control) if args.watch else None
+    start = time.monotonic()
+    try:
+        if watcher is not None:
+            # Démarrée avant le premier passage : rien de ce qui arrive pendant n'est perdu
+            watcher.start()
+        engine = make_engine()
+        engine.run()
+        if watcher is not None:
+            for changes in watcher.batches():
+                engine = make_engine(changes)
+                engine.run()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if journal is not None:
+            journal.close()
+    if reporter.tty and not args.quiet:
+        sys.stderr.write("\n")
+
+    summary = reporter.summary(mappings, engine.run_id, time.monotonic() - start)
+    if args.json:
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    elif not args.quiet:
+        counts = ", ".join(f"{k}: {v}" for k, v in sorted(summary['counts'].items())) or "aucun changement"
+        print(f"Terminé en {summary['elapsed']:.1f} s — {summary['files']} fichiers ({counts})")
+
+    # En mode surveillance, Ctrl+C est la façon normale de s'arrêter
+    if control.cancelled and watcher is None:
+        return EXIT_CANCELLED
+    failed = summary['errors'] or any(m['status'] == 'error' for m in summary['mappings'])
+    return EXIT_SYNC_ERRORS if failed else EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
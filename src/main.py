@@ -1,263 +1,19 @@
 import sys
 import os
-import json
-import shutil
-import zlib
-from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-    QHBoxLayout, QLabel, QLineEdit, QPushButton, QProgressBar, QFileDialog,
-    QScrollArea, QDialog, QTextEdit, QMessageBox)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+    QHBoxLayout, QLabel, QPushButton, QProgressBar, QScrollArea, QMessageBox, QFileDialog, QCheckBox)
+from PyQt6.QtCore import Qt
 
-class SyncWorker(QThread):
-    progress = pyqtSignal(int, int, int)  # mapping_index, current, total
-    log_entry = pyqtSignal(dict)
-    finished = pyqtSignal()
-
-    def __init__(self, mappings):
-        super().__init__()
-        self.mappings = mappings
-
-    def calculate_crc32(self, filepath):
-        try:
-            with open(filepath, 'rb') as f:
-                return format(zlib.crc32(f.read()) & 0xFFFFFFFF, '08x')
-        except Exception as e:
-            print(f"Error calculating CRC for {filepath}: {e}")
-            return None
-
-    def run(self):
-        for idx, mapping in enumerate(self.mappings):
-            try:
-                source = mapping['source']
-                dest = mapping['destination']
-                
-                if not os.path.exists(source):
-                    raise FileNotFoundError(f"Le dossier source n'existe pas: {source}")
-                
-                if not os.path.exists(dest):
-                    os.makedirs(dest)
-                
-                files = [f for f in os.listdir(source) if os.path.isfile(os.path.join(source, f))]
-                self.progress.emit(idx, 0, len(files))
-                
-                for i, file in enumerate(files):
-                    src_path = os.path.join(source, file)
-                    dst_path = os.path.join(dest, file)
-                    
-                    try:
-                        if os.path.exists(dst_path):
-                            src_crc = self.calculate_crc32(src_path)
-                            dst_crc = self.calculate_crc32(dst_path)
-                            
-                            if src_crc != dst_crc:
-                                base, ext = os.path.splitext(file)
-                                counter = 1
-                                while os.path.exists(dst_path):
-                                    new_name = f"{base}_{counter:03d}{ext}"
-                                    dst_path = os.path.join(dest, new_name)
-                                    counter += 1
-                                
-                                shutil.copy2(src_path, dst_path)
-                                self.log_entry.emit({
-                                    'type': 'renamed',
-                                    'original_name': file,
-                                    'new_name': os.path.basename(dst_path),
-                                    'source': src_path,
-                                    'destination': dst_path,
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                        else:
-                            shutil.copy2(src_path, dst_path)
-                            self.log_entry.emit({
-                                'type': 'copied',
-                                'name': file,
-                                'source': src_path,
-                                'destination': dst_path,
-                                'timestamp': datetime.now().isoformat()
-                            })
-                        
-                        self.progress.emit(idx, i + 1, len(files))
-                        
-                    except Exception as e:
-                        self.log_entry.emit({
-                            'type': 'error',
-                            'file': file,
-                            'source': src_path,
-                            'error': str(e),
-                            'timestamp': datetime.now().isoformat()
-                        })
-                        
-            except Exception as e:
-                self.log_entry.emit({
-                    'type': 'error',
-                    'source': source,
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
-                self.progress.emit(idx, 0, 1)
-        
-        self.finished.emit()
-
-class LogDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Journal de synchronisation")
-        self.setMinimumSize(800, 600)
-        
-        layout = QVBoxLayout()
-        
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-                border-radius: 4px;
-                padding: 8px;
-                font-family: monospace;
-            }
-        """)
-        layout.addWidget(self.log_text)
-        
-        close_button = QPushButton("Fermer")
-        close_button.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
-        close_button.clicked.connect(self.close)
-        layout.addWidget(close_button)
-        
-        self.setLayout(layout)
-        
-    def add_log(self, entry):
-        timestamp = datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-        html = f"<p><strong>[{timestamp}]</strong> "
-        
-        if entry['type'] == 'error':
-            html += f'<span style="color: #dc3545;">ERREUR: {entry["error"]}</span>'
-        elif entry['type'] == 'renamed':
-            html += f'<span style="color: #ffc107;">Renommé: {entry["original_name"]} → {entry["new_name"]}</span>'
-        else:
-            html += f'<span style="color: #28a745;">Copié: {entry["name"]}</span>'
-        
-        html += f'<br><span style="color: #6c757d;">Source: {entry["source"]}</span>'
-        if 'destination' in entry:
-            html += f'<br><span style="color: #6c757d;">Destination: {entry["destination"]}</span>'
-        
-        html += "</p>"
-        self.log_text.append(html)
-
-class FolderPairWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-                border-radius: 8px;
-                padding: 16px;
-                margin: 4px;
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #ced4da;
-                border-radius: 4px;
-                background-color: white;
-            }
-            QPushButton {
-                background-color: #007bff;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #0056b3;
-            }
-            QProgressBar {
-                border: 1px solid #dee2e6;
-                border-radius: 4px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #28a745;
-                border-radius: 3px;
-            }
-        """)
-        
-        layout = QVBoxLayout()
-        
-        # Chemins
-        paths_layout = QHBoxLayout()
-        
-        # Source
-        source_layout = QVBoxLayout()
-        source_label = QLabel("Dossier source (Smartphone):")
-        source_label.setStyleSheet("font-weight: bold;")
-        source_layout.addWidget(source_label)
-        
-        self.source_edit = QLineEdit()
-        source_browse = QPushButton("Parcourir")
-        source_h_layout = QHBoxLayout()
-        source_h_layout.addWidget(self.source_edit)
-        source_h_layout.addWidget(source_browse)
-        source_layout.addLayout(source_h_layout)
-        
-        # Destination
-        dest_layout = QVBoxLayout()
-        dest_label = QLabel("Dossier destination (PC):")
-        dest_label.setStyleSheet("font-weight: bold;")
-        dest_layout.addWidget(dest_label)
-        
-        self.dest_edit = QLineEdit()
-        dest_browse = QPushButton("Parcourir")
-        dest_h_layout = QHBoxLayout()
-        dest_h_layout.addWidget(self.dest_edit)
-        dest_h_layout.addWidget(dest_browse)
-        dest_layout.addLayout(dest_h_layout)
-        
-        source_browse.clicked.connect(lambda: self.browse_folder(self.source_edit))
-        dest_browse.clicked.connect(lambda: self.browse_folder(self.dest_edit))
-        
-        paths_layout.addLayout(source_layout)
-        paths_layout.addLayout(dest_layout)
-        
-        layout.addLayout(paths_layout)
-        
-        # Barre de progression
-        self.progress = QProgressBar()
-        self.progress.setFormat("%v/%m fichiers (%p%)")
-        layout.addWidget(self.progress)
-        
-        self.setLayout(layout)
-    
-    def browse_folder(self, line_edit):
-        folder = QFileDialog.getExistingDirectory(self, "Sélectionner un dossier")
-        if folder:
-            line_edit.setText(folder)
-    
-    def get_mapping(self):
-        return {
-            'source': self.source_edit.text(),
-            'destination': self.dest_edit.text()
-        }
-    
-    def set_mapping(self, mapping):
-        self.source_edit.setText(mapping['source'])
-        self.dest_edit.setText(mapping['destination'])
-    
-    def update_progress(self, current, total):
-        self.progress.setMaximum(total)
-        self.progress.setValue(current)
+# Permet l'import du paquet `src` quand ce fichier est lancé comme script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.folder_pair import FolderPair
+from src.utils.config import load_mappings, save_mappings, validate_mappings
+from src.utils.journal import SyncJournal
+from src.utils.planner import SyncPlan
+from src.utils.run_state import RunState
+from src.utils.sync_worker import SyncWorker, WatchWorker
+from src.widgets.folder_pair_widget import FolderPairWidget, update_progress_bar
+from src.widgets.log_dialog import LogDialog
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -313,6 +69,11 @@ class MainWindow(QMainWindow):
         scroll.setWidget(scroll_widget)
         main_layout.addWidget(scroll)
         
+        # Progression globale
+        self.total_progress = QProgressBar()
+        self.total_progress.setVisible(False)
+        main_layout.addWidget(self.total_progress)
+        
         # Boutons
         buttons_layout = QHBoxLayout()
         
@@ -321,14 +82,31 @@ class MainWindow(QMainWindow):
         sync_button.setObjectName("syncButton")
         save_button = QPushButton("Sauvegarder")
         log_button = QPushButton("Journal")
+        self.sync_button = sync_button
+        self.pause_button = QPushButton("Pause")
+        self.cancel_button = QPushButton("Annuler")
+        self.watch_button = QPushButton("Surveillance")
+        self.watch_button.setCheckable(True)
+        self.watch_button.setToolTip("Synchronise automatiquement les nouveaux fichiers tant que le téléphone est branché")
+        self.full_check = QCheckBox("Tout réexaminer")
+        self.full_check.setToolTip("Compare tous les fichiers, même ceux inchangés depuis la dernière synchronisation")
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
         
         add_button.clicked.connect(self.add_mapping)
         sync_button.clicked.connect(self.start_sync)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button.clicked.connect(self.cancel_sync)
+        self.watch_button.toggled.connect(self.toggle_watch)
         save_button.clicked.connect(self.save_mappings)
         log_button.clicked.connect(self.show_log)
         
         buttons_layout.addWidget(add_button)
         buttons_layout.addWidget(sync_button)
+        buttons_layout.addWidget(self.full_check)
+        buttons_layout.addWidget(self.pause_button)
+        buttons_layout.addWidget(self.cancel_button)
+        buttons_layout.addWidget(self.watch_button)
         buttons_layout.addWidget(save_button)
         buttons_layout.addWidget(log_button)
         buttons_layout.addStretch()
@@ -338,12 +116,20 @@ class MainWindow(QMainWindow):
         main_widget.setLayout(main_layout)
         
         self.mapping_widgets = []
-        self.log_entries = []
-        self.log_dialog = LogDialog(self)
+        self.watch_worker = None
+        self.journal = self.open_journal()
+        self.log_dialog = LogDialog(self, journal=self.journal)
         
         # Charger les mappings sauvegardés
         self.load_mappings()
     
+    def open_journal(self):
+        try:
+            return SyncJournal()
+        except Exception as e:
+            print(f"Error opening sync journal: {e}")
+            return None
+    
     def add_mapping(self):
         widget = FolderPairWidget()
         self.mapping_widgets.append(widget)
@@ -351,13 +137,7 @@ class MainWindow(QMainWindow):
     
     def save_mappings(self):
         try:
-            mappings = [w.get_mapping() for w in self.mapping_widgets]
-            config_dir = os.path.expanduser('~/.sync_smartphone')
-            os.makedirs(config_dir, exist_ok=True)
-            config_file = os.path.join(config_dir, 'mappings.json')
-            
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(mappings, f, ensure_ascii=False, indent=2)
+            save_mappings([w.get_mapping() for w in self.mapping_widgets])
             
             QMessageBox.information(self, "Succès", "Les mappings ont été sauvegardés avec succès.")
         except Exception as e:
@@ -365,13 +145,10 @@ class MainWindow(QMainWindow):
     
     def load_mappings(self):
         try:
-            config_file = os.path.expanduser('~/.sync_smartphone/mappings.json')
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    mappings = json.load(f)
-            else:
+            mappings = load_mappings()
+            if mappings is None:
                 # Mappings par défaut
-                mappings = [
+                mappings = [FolderPair.from_dict(m) for m in [
                     {
                         'source': 'Ce PC\\HUAWEI Y7 2019\\Carte SD\\DCIM\\Camera',
                         'destination': 'D:\\Images\\e-port huawei appareil photo N°4'
@@ -404,7 +181,7 @@ class MainWindow(QMainWindow):
                         'source': 'Ce PC\\HUAWEI Y7 2019\\Carte SD\\Pictures\\nikie',
                         'destination': 'D:\\Images\\e-port huawei Nikie'
                     }
-                ]
+                ]]
             
             for mapping in mappings:
                 widget = FolderPairWidget()
@@ -419,42 +196,167 @@ class MainWindow(QMainWindow):
         mappings = [w.get_mapping() for w in self.mapping_widgets]
         
         # Vérification des chemins
-        invalid_mappings = []
-        for mapping in mappings:
-            if not mapping['source'] or not mapping['destination']:
-                invalid_mappings.append("Chemins vides")
-            elif not os.path.exists(mapping['source']):
-                invalid_mappings.append(f"Source introuvable: {mapping['source']}")
+        invalid_mappings = validate_mappings(mappings)
         
         if invalid_mappings:
             QMessageBox.critical(self, "Erreur", 
                 "Erreurs dans les mappings:\n" + "\n".join(invalid_mappings))
             return
         
-        self.worker = SyncWorker(mappings)
+        run_state = RunState.load()
+        if run_state and run_state.matches(mappings):
+            answer = QMessageBox.question(self, "Reprendre",
+                "La synchronisation précédente a été interrompue.\n"
+                "Reprendre là où elle s'était arrêtée ?")
+            if answer != QMessageBox.StandardButton.Yes:
+                run_state.clear()
+        else:
+            run_state.clear()
+        
+        # Première étape : analyse sans copie, pour connaître les volumes avant de lancer
+        self.plan = SyncPlan(mappings)
+        self.run_state = run_state
+        self.incremental = not self.full_check.isChecked()
+        self.worker = SyncWorker(mappings, dry_run=self.plan, run_state=run_state,
+                                 incremental=self.incremental)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.overall_progress.connect(self.update_total_progress)
+        self.worker.finished.connect(self.plan_finished)
+        self.start_worker()
+    
+    def plan_finished(self):
+        for widget in self.mapping_widgets:
+            widget.progress.reset()
+        self.total_progress.setVisible(False)
+        if self.worker.control.cancelled:
+            self.sync_finished()
+            return
+        
+        plan = self.plan
+        problems = plan.preflight()
+        box = QMessageBox(self)
+        box.setWindowTitle("Plan de synchronisation")
+        box.setText(plan.summary())
+        if problems:
+            box.setIcon(QMessageBox.Icon.Warning)
+            box.setInformativeText("\n".join(problems))
+        sync = box.addButton("Synchroniser", QMessageBox.ButtonRole.AcceptRole)
+        sync.setEnabled(not problems)
+        export = box.addButton("Exporter JSON", QMessageBox.ButtonRole.ActionRole)
+        box.addButton("Annuler", QMessageBox.ButtonRole.RejectRole)
+        # L'export ne ferme pas la boîte : on peut encore lancer ou annuler ensuite
+        export.clicked.disconnect()
+        export.clicked.connect(self.export_plan)
+        box.exec()
+        if box.clickedButton() is not sync:
+            self.sync_button.setEnabled(True)
+            self.watch_button.setEnabled(True)
+            self.pause_button.setEnabled(False)
+            self.cancel_button.setEnabled(False)
+            return
+        
+        self.worker = SyncWorker(plan.mappings, plan=plan, journal=self.journal,
+                                 run_state=self.run_state, incremental=self.incremental)
         self.worker.progress.connect(self.update_progress)
-        self.worker.log_entry.connect(self.add_log_entry)
+        self.worker.overall_progress.connect(self.update_total_progress)
+        self.worker.log_entries.connect(self.add_log_entries)
         self.worker.finished.connect(self.sync_finished)
+        self.start_worker()
+    
+    def export_plan(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter le plan", "plan.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.plan.save_json(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export: {str(e)}")
+    
+    def start_worker(self):
+        self.sync_button.setEnabled(False)
+        self.watch_button.setEnabled(False)
+        self.pause_button.setText("Pause")
+        self.pause_button.setEnabled(True)
+        self.cancel_button.setEnabled(True)
         self.worker.start()
     
-    def update_progress(self, mapping_index, current, total):
+    def toggle_pause(self):
+        control = self.worker.control
+        if control.paused:
+            control.resume()
+            self.pause_button.setText("Pause")
+        else:
+            control.pause()
+            self.pause_button.setText("Reprendre")
+    
+    def cancel_sync(self):
+        self.worker.control.cancel()
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+    
+    def toggle_watch(self, enabled):
+        if not enabled:
+            if self.watch_worker is not None:
+                self.watch_worker.control.cancel()
+            return
+        
+        mappings = [w.get_mapping() for w in self.mapping_widgets]
+        invalid_mappings = validate_mappings(mappings)
+        if invalid_mappings:
+            QMessageBox.critical(self, "Erreur", 
+                "Erreurs dans les mappings:\n" + "\n".join(invalid_mappings))
+            self.watch_button.setChecked(False)
+            return
+        
+        self.watch_worker = WatchWorker(mappings, journal=self.journal)
+        self.watch_worker.progress.connect(self.update_progress)
+        self.watch_worker.overall_progress.connect(self.update_total_progress)
+        self.watch_worker.log_entries.connect(self.add_log_entries)
+        self.watch_worker.finished.connect(self.watch_finished)
+        self.sync_button.setEnabled(False)
+        self.watch_worker.start()
+    
+    def watch_finished(self):
+        self.watch_worker = None
+        self.watch_button.setChecked(False)
+        self.sync_button.setEnabled(True)
+        for widget in self.mapping_widgets:
+            widget.progress.reset()
+        self.total_progress.setVisible(False)
+    
+    def update_progress(self, mapping_index, progress):
         if 0 <= mapping_index < len(self.mapping_widgets):
-            self.mapping_widgets[mapping_index].update_progress(current, total)
+            self.mapping_widgets[mapping_index].update_progress(progress)
+    
+    def update_total_progress(self, progress):
+        self.total_progress.setVisible(True)
+        update_progress_bar(self.total_progress, progress)
     
-    def add_log_entry(self, entry):
-        self.log_entries.append(entry)
-        self.log_dialog.add_log(entry)
+    def add_log_entries(self, entries):
+        self.log_dialog.add_logs(entries)
     
     def sync_finished(self):
-        QMessageBox.information(self, "Terminé", "La synchronisation est terminée.")
+        self.sync_button.setEnabled(True)
+        self.watch_button.setEnabled(True)
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+        if self.worker.control.cancelled:
+            QMessageBox.information(self, "Annulé",
+                "La synchronisation a été annulée. Elle pourra reprendre au prochain lancement.")
+        else:
+            QMessageBox.information(self, "Terminé", "La synchronisation est terminée.")
         for widget in self.mapping_widgets:
             widget.progress.reset()
+        self.total_progress.setVisible(False)
     
     def show_log(self):
         self.log_dialog.show()
 
-if __name__ == '__main__':
+def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    return app.exec()
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import List
+from .folder_pair import FolderPair, Progress
+
+@dataclass
+class ProgressEvent:
+    index: int
+    pair: FolderPair
+    progress: Progress
+
+@dataclass
+class OverallProgressEvent:
+    progress: Progress
+
+@dataclass
+class LogEvent:
+    entries: List[dict] = field(default_factory=list)
+
+@dataclass
+class FinishedEvent:
+    run_id: str
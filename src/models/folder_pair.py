@@ -1,14 +1,46 @@
 from dataclasses import dataclass
 from typing import Optional
 
+# tiered: taille, puis échantillon début/fin, puis empreinte complète
+# quick: comme tiered, mais taille + date identiques suffisent
+# hash: empreinte complète systématique (ancien comportement)
+# direct: comparaison octet par octet, arrêtée au premier bloc différent
+COMPARE_MODES = ('tiered', 'quick', 'hash', 'direct')
+DEFAULT_COMPARE_MODE = 'tiered'
+
 @dataclass
 class Progress:
     current: int = 0
     total: int = 0
-    status: str = 'pending'  # pending, syncing, completed, error
+    status: str = 'pending'  # pending, syncing, completed, error, cancelled
+    bytes_done: int = 0
+    bytes_transferred: int = 0  # octets réellement copiés, sans les fichiers sautés : base du débit
+    bytes_total: int = 0
+    rate: float = 0.0  # octets/s lissé
+    instant_rate: float = 0.0  # octets/s sur le dernier intervalle
+    eta: Optional[float] = None  # secondes restantes
 
 @dataclass
 class FolderPair:
     source: str
     destination: str
-    progress: Optional[Progress] = None
\ No newline at end of file
+    progress: Optional[Progress] = None
+    compare_mode: str = DEFAULT_COMPARE_MODE
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'destination': self.destination,
+            'compare_mode': self.compare_mode
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        compare_mode = data.get('compare_mode', DEFAULT_COMPARE_MODE)
+        if compare_mode not in COMPARE_MODES:
+            compare_mode = DEFAULT_COMPARE_MODE
+        return cls(
+            source=data['source'],
+            destination=data['destination'],
+            compare_mode=compare_mode
+        )
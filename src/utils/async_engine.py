@@ -0,0 +1,55 @@
+import asyncio
+from ..models.events import FinishedEvent, LogEvent, OverallProgressEvent, ProgressEvent
+from .control import SyncControl
+from .sync_engine import SyncEngine
+
+
+class AsyncSyncEngine:
+    """Interface asyncio du moteur : `async for event in engine.sync(pairs)`.
+
+    La synchronisation elle-même (lectures, hachage, copies) tourne dans un
+    exécuteur ; la boucle d'événements ne fait que relayer des événements typés.
+    Plusieurs appels à `sync` peuvent s'exécuter en même temps sur la même boucle.
+    Abandonner l'itération (break, annulation de la tâche) annule la synchronisation.
+    """
+
+    def __init__(self, executor=None, **options):
+        self.executor = executor
+        self.options = options
+
+    async def sync(self, pairs):
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        options = dict(self.options)
+        control = options.setdefault('control', SyncControl())
+
+        def push(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        engine = SyncEngine(
+            pairs,
+            on_progress=lambda idx, progress: push(ProgressEvent(idx, pairs[idx], progress)),
+            on_overall_progress=lambda progress: push(OverallProgressEvent(progress)),
+            on_log_entries=lambda entries: push(LogEvent(entries)),
+            **options
+        )
+        future = loop.run_in_executor(self.executor, engine.run)
+        # Réveille la boucle de lecture à la fin du moteur, même sans nouvel événement
+        future.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            # Événements arrivés juste avant la fin du moteur
+            while not events.empty():
+                event = events.get_nowait()
+                if event is not None:
+                    yield event
+            await future
+            yield FinishedEvent(engine.run_id)
+        finally:
+            if not future.done():
+                control.cancel()
+                await asyncio.shield(future)
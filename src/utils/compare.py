@@ -0,0 +1,179 @@
+import os
+import random
+import zlib
+from .hashing import DEFAULT_ALGORITHM, hash_file
+
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_ALGORITHM = 'sample-crc32'
+BLOCK_SIZE = 1024 * 1024
+VERIFY_POLICIES = ('none', 'sample', 'full')
+VERIFY_SAMPLES = 8  # blocs relus par la vérification échantillonnée, en plus du premier et du dernier
+
+
+def sample_fingerprint(path, size, sample_size=SAMPLE_SIZE):
+    # Début et fin du fichier : suffit à distinguer la plupart des médias réencodés
+    with open(path, 'rb') as f:
+        if size <= 2 * sample_size:
+            return format(zlib.crc32(f.read()) & 0xFFFFFFFF, '08x')
+        crc = zlib.crc32(f.read(sample_size))
+        f.seek(size - sample_size)
+        crc = zlib.crc32(f.read(sample_size), crc)
+    return format(crc & 0xFFFFFFFF, '08x')
+
+
+def _fill(f, buf):
+    # Les montages FUSE/MTP peuvent renvoyer des lectures courtes avant la fin du fichier
+    view = memoryview(buf)
+    total = 0
+    while total < len(buf):
+        n = f.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def files_equal(path_a, path_b, block_size=BLOCK_SIZE, check=None):
+    # Lecture en parallèle des deux fichiers, arrêt au premier bloc différent
+    buf_a = bytearray(block_size)
+    buf_b = bytearray(block_size)
+    with open(path_a, 'rb', buffering=0) as fa, open(path_b, 'rb', buffering=0) as fb:
+        while True:
+            n_a = _fill(fa, buf_a)
+            n_b = _fill(fb, buf_b)
+            if n_a != n_b:
+                return False
+            if not n_a:
+                return True
+            if check:
+                check()
+            if n_a == block_size:
+                if buf_a != buf_b:
+                    return False
+            elif buf_a[:n_a] != buf_b[:n_b]:
+                return False
+
+
+def _drop_cache(f):
+    # Écrit sur le disque puis évince du cache : la relecture porte sur le support
+    try:
+        os.fsync(f.fileno())
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+
+def verify_blocks(path, digest, policy='full', samples=VERIFY_SAMPLES):
+    """Relit `path` et compare ses blocs aux CRC d'un BlockDigest.
+
+    policy 'full' relit tout le fichier, 'sample' le premier et le dernier bloc
+    plus `samples` blocs tirés au hasard.
+    """
+    crcs = digest.block_crcs()
+    blocks = range(len(crcs))
+    if policy == 'sample' and len(crcs) > samples + 2:
+        middle = random.sample(range(1, len(crcs) - 1), samples)
+        blocks = [0] + sorted(middle) + [len(crcs) - 1]
+    buf = bytearray(digest.block_size)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        if os.fstat(f.fileno()).st_size != digest.size:
+            return False
+        _drop_cache(f)
+        for i in blocks:
+            f.seek(i * digest.block_size)
+            n = _fill(f, buf)
+            if zlib.crc32(view[:n]) != crcs[i]:
+                return False
+    return True
+
+
+class FileComparator:
+    def __init__(self, mode='tiered', index=None, algorithm=DEFAULT_ALGORITHM, check=None,
+                 pool=None):
+        self.mode = mode
+        self.index = index
+        self.algorithm = algorithm
+        self.check = check  # appelé entre deux blocs lus (pause, annulation)
+        self.pool = pool  # HashPool : empreintes calculées à l'avance
+
+    def prefetch(self, src_path, dst_path, src_st):
+        """Programme dans le pool le hachage des deux fichiers s'il sera nécessaire.
+
+        En mode 'direct', la comparaison octet par octet s'arrête au premier écart :
+        rien n'est haché d'avance. En mode 'tiered', seuls les fichiers dont les
+        échantillons concordent le sont, comme dans same_content.
+        """
+        if self.pool is None or self.mode not in ('hash', 'tiered'):
+            return
+        try:
+            dst_st = os.stat(dst_path)
+        except OSError:
+            return
+        if src_st.st_size != dst_st.st_size:
+            return
+        if self.mode == 'tiered' and src_st.st_size > 2 * SAMPLE_SIZE and \
+                self.sample(src_path, src_st) != self.sample(dst_path, dst_st):
+            return
+        self.pool.submit(src_path, src_st)
+        self.pool.submit(dst_path, dst_st)
+
+    def cached(self, path, st, algorithm):
+        # Une empreinte encore en calcul n'est pas attendue : les étapes moins chères passent avant
+        if self.pool is not None and algorithm == self.algorithm:
+            digest = self.pool.result(path, st, wait=False)
+            if digest is not None:
+                return digest
+        if self.index is None:
+            return None
+        return self.index.lookup(path, st, algorithm)
+
+    def full_hash(self, path, st):
+        if self.pool is not None:
+            digest = self.pool.result(path, st)
+            if digest is not None:
+                return digest
+        if self.index is not None:
+            return self.index.fingerprint(path, self.algorithm, st, progress=self.check)
+        return hash_file(path, self.algorithm, progress=self.check)
+
+    def sample(self, path, st):
+        digest = self.cached(path, st, SAMPLE_ALGORITHM)
+        if digest is None:
+            digest = sample_fingerprint(path, st.st_size)
+            if self.index is not None:
+                self.index.store(path, st, digest, SAMPLE_ALGORITHM)
+        return digest
+
+    def same_content(self, src_path, dst_path, src_st=None, dst_st=None):
+        src_st = src_st or os.stat(src_path)
+        dst_st = dst_st or os.stat(dst_path)
+
+        if self.mode == 'hash':
+            return self.full_hash(src_path, src_st) == self.full_hash(dst_path, dst_st)
+
+        if src_st.st_size != dst_st.st_size:
+            return False
+        if self.mode == 'quick' and src_st.st_mtime_ns == dst_st.st_mtime_ns:
+            return True
+
+        # Empreintes déjà connues des deux côtés : aucune lecture
+        src_digest = self.cached(src_path, src_st, self.algorithm)
+        dst_digest = self.cached(dst_path, dst_st, self.algorithm)
+        if src_digest is not None and dst_digest is not None:
+            return src_digest == dst_digest
+
+        if self.mode == 'direct':
+            # Un seul côté indexé : hacher l'autre coûte moins qu'une double lecture
+            if src_digest is not None:
+                return src_digest == self.full_hash(dst_path, dst_st)
+            if dst_digest is not None:
+                return dst_digest == self.full_hash(src_path, src_st)
+            return files_equal(src_path, dst_path, check=self.check)
+
+        if src_st.st_size > 2 * SAMPLE_SIZE and \
+                self.sample(src_path, src_st) != self.sample(dst_path, dst_st):
+            return False
+
+        return self.full_hash(src_path, src_st) == self.full_hash(dst_path, dst_st)
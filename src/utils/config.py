@@ -0,0 +1,36 @@
+import json
+import os
+from ..models.folder_pair import FolderPair
+
+CONFIG_DIR = os.path.expanduser('~/.sync_smartphone')
+MAPPINGS_FILE = 'mappings.json'
+
+
+def config_path(name):
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    return os.path.join(CONFIG_DIR, name)
+
+
+def load_mappings(path=None):
+    """Mappings enregistrés, ou None si le fichier n'existe pas."""
+    path = path or os.path.join(CONFIG_DIR, MAPPINGS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return [FolderPair.from_dict(m) for m in json.load(f)]
+
+
+def save_mappings(mappings, path=None):
+    path = path or config_path(MAPPINGS_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([m.to_dict() for m in mappings], f, ensure_ascii=False, indent=2)
+
+
+def validate_mappings(mappings):
+    errors = []
+    for mapping in mappings:
+        if not mapping.source or not mapping.destination:
+            errors.append("Chemins vides")
+        elif not os.path.exists(mapping.source):
+            errors.append(f"Source introuvable: {mapping.source}")
+    return errors
@@ -0,0 +1,45 @@
+import threading
+
+
+class SyncCancelled(Exception):
+    def __init__(self):
+        super().__init__("Synchronisation annulée")
+
+
+class SyncControl:
+    """Pause, reprise et annulation coopératives d'une synchronisation.
+
+    Les boucles du moteur (scan, lectures, copies, hachages) appellent `check()`
+    entre deux blocs : l'appel bloque tant que la synchronisation est en pause et
+    lève SyncCancelled une fois qu'elle a été annulée.
+    """
+
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # débloque les threads en pause pour qu'ils s'arrêtent
+
+    def check(self, *args):
+        # *args : utilisable directement comme callback de progression
+        if not self._running.is_set():
+            self._running.wait()
+        if self._cancelled.is_set():
+            raise SyncCancelled()
@@ -0,0 +1,198 @@
+import errno
+import os
+import sys
+import threading
+from .scheduler import is_remote
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409  # _IOW(0x94, 9, int), Linux
+KERNEL_CHUNK = 8 * 1024 * 1024  # par appel système : progression et annulation restent réactives
+BUFFER_SIZE = 8 * 1024 * 1024
+
+# Erreurs signifiant « méthode non prise en charge pour ces deux systèmes de fichiers »
+_UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY,
+                errno.EOPNOTSUPP, errno.EBADF, errno.EPERM}
+if hasattr(errno, 'ENOTSUP'):
+    _UNSUPPORTED.add(errno.ENOTSUP)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _kernel_methods():
+    methods = []
+    if sys.platform.startswith('linux'):
+        if fcntl is not None:
+            methods.append('reflink')
+        if hasattr(os, 'copy_file_range'):
+            methods.append('copy_file_range')
+        if hasattr(os, 'sendfile'):
+            methods.append('sendfile')
+    return methods
+
+
+KERNEL_METHODS = tuple(_kernel_methods())
+
+
+def _reflink(fsrc, fdst, offset, progress):
+    if offset:
+        raise _Unsupported()
+    try:
+        fcntl.ioctl(fdst, FICLONE, fsrc)
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            raise _Unsupported() from e
+        raise
+    size = os.fstat(fdst).st_size
+    if progress and size:
+        progress(size)
+    return size
+
+
+def _copy_file_range(fsrc, fdst, offset, progress):
+    while True:
+        try:
+            n = os.copy_file_range(fsrc, fdst, KERNEL_CHUNK, offset, offset)
+        except OSError as e:
+            if e.errno in _UNSUPPORTED:
+                raise _Unsupported() from e
+            raise
+        if n == 0:
+            # Certains systèmes de fichiers (procfs, FUSE) renvoient 0 au lieu d'une erreur,
+            # y compris au milieu d'une copie reprise
+            if offset < os.fstat(fsrc).st_size:
+                raise _Unsupported()
+            return offset
+        offset += n
+        if progress:
+            progress(n)
+
+
+def _sendfile(fsrc, fdst, offset, progress):
+    os.lseek(fdst, offset, os.SEEK_SET)
+    while True:
+        try:
+            n = os.sendfile(fdst, fsrc, offset, KERNEL_CHUNK)
+        except OSError as e:
+            if e.errno in _UNSUPPORTED:
+                raise _Unsupported() from e
+            raise
+        if n == 0:
+            return offset
+        offset += n
+        if progress:
+            progress(n)
+
+
+def _buffered(fsrc, fdst, offset, progress, buffer_size=BUFFER_SIZE):
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    os.lseek(fsrc, offset, os.SEEK_SET)
+    os.lseek(fdst, offset, os.SEEK_SET)
+    with open(fsrc, 'rb', buffering=0, closefd=False) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                return offset
+            done = 0
+            while done < n:
+                done += os.write(fdst, view[done:n])
+            offset += n
+            if progress:
+                progress(n)
+
+
+_COPIERS = {
+    'reflink': _reflink,
+    'copy_file_range': _copy_file_range,
+    'sendfile': _sendfile,
+}
+
+
+class CopyBackend:
+    """Copie par le noyau quand c'est possible, méthode choisie par couple de volumes.
+
+    Ordre d'essai : reflink (FICLONE, instantané sur Btrfs/XFS), copy_file_range,
+    sendfile, puis boucle readinto avec un grand tampon. Une méthode refusée pour un
+    couple (volume source, volume destination) n'est plus retentée pour ce couple.
+
+    Les montages FUSE (téléphone en MTP) et réseau sont exclus : leurs fichiers
+    passent par les files du pipeline, qui savent reprendre une copie interrompue
+    et hachent la source au vol sans la relire.
+    """
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._methods = {}  # (st_dev source, st_dev destination) -> méthodes encore candidates
+        self._devices = {}  # dossier -> st_dev, pour ne pas refaire un stat par fichier
+        self._remote = {}  # st_dev -> montage FUSE ou réseau
+        self._lock = threading.Lock()
+
+    def _candidates(self, key):
+        with self._lock:
+            return list(self._methods.setdefault(key, list(KERNEL_METHODS)))
+
+    def _demote(self, key, method):
+        with self._lock:
+            methods = self._methods.get(key, [])
+            if method in methods:
+                methods.remove(method)
+
+    def _device(self, path):
+        directory = os.path.dirname(path) or '.'
+        dev = self._devices.get(directory)
+        if dev is None:
+            dev = self._devices[directory] = os.stat(directory).st_dev
+            if dev not in self._remote:
+                self._remote[dev] = is_remote(directory)
+        return dev
+
+    def accelerated(self, source, destination):
+        """Vrai si une copie par le noyau est envisageable entre ces deux emplacements."""
+        if not KERNEL_METHODS:
+            return False
+        try:
+            key = (self._device(source), self._device(destination))
+        except OSError:
+            return False
+        if self._remote[key[0]] or self._remote[key[1]]:
+            return False
+        return bool(self._candidates(key))
+
+    def copy(self, source, destination, progress=None, offset=0):
+        """Copie le contenu de `source` vers `destination` et renvoie la méthode utilisée.
+
+        `progress(n)` est appelé au fil des octets copiés. Avec `offset`, les
+        `offset` premiers octets de `destination` sont gardés et la copie reprend
+        à partir de là. Les métadonnées (dates, permissions) ne sont pas copiées.
+        """
+        fsrc = os.open(source, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+            fdst = os.open(destination, flags | (0 if offset else os.O_TRUNC), 0o666)
+            try:
+                if offset:
+                    os.ftruncate(fdst, offset)
+                key = (os.fstat(fsrc).st_dev, os.fstat(fdst).st_dev)
+                for method in self._candidates(key):
+                    if offset and method == 'reflink':
+                        # Un reflink ne s'applique qu'au fichier entier : sauté, mais pas écarté
+                        continue
+                    try:
+                        _COPIERS[method](fsrc, fdst, offset, progress)
+                        return method
+                    except _Unsupported:
+                        # Reprise au même point avec la méthode suivante
+                        self._demote(key, method)
+                        offset = os.fstat(fdst).st_size
+                _buffered(fsrc, fdst, offset, progress, self.buffer_size)
+                return 'buffered'
+            finally:
+                os.close(fdst)
+        finally:
+            os.close(fsrc)
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+from .config import config_path
+from .hashing import DEFAULT_ALGORITHM, hash_file
+
+COMMIT_EVERY = 500
+
+
+def index_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _same_inode(a, b):
+    # Sous Windows, DirEntry.stat() renvoie st_ino = 0 : l'inode n'est alors pas comparé
+    return a == b or not a or not b
+
+
+def _same_stat(a, b):
+    return (a.st_size, a.st_mtime_ns) == (b.st_size, b.st_mtime_ns) and _same_inode(a.st_ino, b.st_ino)
+
+
+class FingerprintIndex:
+    """Cache persistant des empreintes, invalidé dès que taille, mtime ou inode (s'il est connu) changent."""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config_path('fingerprints.db')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                path TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (path, algorithm)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def lookup(self, path, st, algorithm=DEFAULT_ALGORITHM):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, inode, digest FROM fingerprints '
+                'WHERE path = ? AND algorithm = ?',
+                (index_key(path), algorithm)).fetchone()
+        if row and row[:2] == (st.st_size, st.st_mtime_ns) and _same_inode(row[2], st.st_ino):
+            return row[3]
+        return None
+
+    def store(self, path, st, digest, algorithm=DEFAULT_ALGORITHM):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)',
+                (index_key(path), algorithm, st.st_size, st.st_mtime_ns, st.st_ino, digest))
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def fingerprint(self, path, algorithm=DEFAULT_ALGORITHM, st=None, progress=None):
+        if st is None:
+            st = os.stat(path)
+        digest = self.lookup(path, st, algorithm)
+        if digest is None:
+            digest = hash_file(path, algorithm, progress=progress)
+            # Ne pas mettre en cache un fichier modifié pendant le hachage
+            if _same_stat(st, os.stat(path)):
+                self.store(path, st, digest, algorithm)
+        return digest
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
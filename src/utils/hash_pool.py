@@ -0,0 +1,126 @@
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from .hashing import DEFAULT_ALGORITHM, hash_file
+
+# Algorithmes dont l'implémentation libère le GIL sur les gros blocs : des threads suffisent
+GIL_RELEASING = {'crc32', 'blake2b', 'blake3'}
+SMALL_FILE = 1024 * 1024  # en dessous, les fichiers sont hachés par lots
+BATCH_FILES = 64
+BATCH_BYTES = 32 * 1024 * 1024
+
+
+def _hash_paths(paths, algorithm):
+    # Exécuté dans un thread ou un processus du pool : un seul aller-retour par lot
+    results = []
+    for path in paths:
+        try:
+            digest = hash_file(path, algorithm)
+            st = os.stat(path)
+            results.append((digest, st.st_size, st.st_mtime_ns))
+        except OSError as e:
+            results.append(e)
+    return results
+
+
+class HashPool:
+    """Hachage en parallèle sur tous les cœurs, en avance sur les comparaisons.
+
+    `submit` programme le hachage d'un fichier ; les petits fichiers sont regroupés
+    en lots pour amortir le coût d'une tâche (surtout avec des processus). Les
+    empreintes obtenues sont enregistrées dans l'index et `result` les attend.
+    """
+
+    def __init__(self, workers=None, algorithm=DEFAULT_ALGORITHM, kind='auto', index=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.algorithm = algorithm
+        if kind == 'auto':
+            kind = 'thread' if algorithm in GIL_RELEASING else 'process'
+        self.kind = kind
+        executor = ThreadPoolExecutor if kind == 'thread' else ProcessPoolExecutor
+        self.executor = executor(max_workers=self.workers)
+        self.index = index
+        self._pending = {}  # chemin -> Future de (empreinte, taille, mtime_ns)
+        self._batch = []
+        self._batch_bytes = 0
+        # Réentrant : le rappel d'une tâche déjà terminée s'exécute dans le thread qui la soumet
+        self._lock = threading.RLock()
+
+    def submit(self, path, st):
+        if self.index is not None and self.index.lookup(path, st, self.algorithm) is not None:
+            return
+        with self._lock:
+            if path in self._pending:
+                return
+            future = self._pending[path] = Future()
+            if st.st_size >= SMALL_FILE:
+                self._submit([(path, st, future)])
+                return
+            self._batch.append((path, st, future))
+            self._batch_bytes += st.st_size
+            if len(self._batch) >= BATCH_FILES or self._batch_bytes >= BATCH_BYTES:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._batch:
+            self._submit(self._batch)
+            self._batch = []
+            self._batch_bytes = 0
+
+    def _submit(self, jobs):
+        job = self.executor.submit(_hash_paths, [path for path, _, _ in jobs], self.algorithm)
+        job.add_done_callback(lambda job: self._deliver(jobs, job))
+
+    def _deliver(self, jobs, job):
+        try:
+            results = job.result()
+        except Exception as e:
+            results = [e] * len(jobs)
+        for (path, st, future), result in zip(jobs, results):
+            if future.done():
+                # Annulé par close()
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                digest, size, mtime_ns = result
+                # Fichier modifié depuis le scan : l'empreinte ne correspond plus à `st`
+                if self.index is not None and (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+                    self.index.store(path, st, digest, self.algorithm)
+                future.set_result(result)
+            with self._lock:
+                self._pending.pop(path, None)
+
+    def result(self, path, st, wait=True):
+        """Empreinte de `path` programmée par `submit`, ou None si elle n'est pas disponible.
+
+        Avec `wait=False`, un hachage encore en cours n'est pas attendu.
+        """
+        with self._lock:
+            future = self._pending.get(path)
+            if future is not None and not wait and not future.done():
+                return None
+            if future is not None and any(f is future for _, _, f in self._batch):
+                self._flush()
+        if future is None:
+            return None
+        try:
+            digest, size, mtime_ns = future.result()
+        except Exception:
+            # Fichier illisible ou pool fermé : la comparaison refera le calcul elle-même
+            return None
+        if (size, mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return None
+        return digest
+
+    def close(self):
+        with self._lock:
+            self._batch = []
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
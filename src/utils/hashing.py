@@ -0,0 +1,146 @@
+import hashlib
+import mmap
+import os
+import threading
+import zlib
+from array import array
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+DEFAULT_ALGORITHM = 'crc32'
+BUFFER_SIZE = 1024 * 1024  # 1 Mo, réutilisé d'un fichier à l'autre
+
+
+class Crc32Hasher:
+    name = 'crc32'
+
+    def __init__(self, value=0):
+        self.value = value
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return format(self.value & 0xFFFFFFFF, '08x')
+
+
+_ALGORITHMS = {
+    'crc32': Crc32Hasher,
+    'blake2b': lambda: hashlib.blake2b(digest_size=32),
+}
+if xxhash is not None:
+    _ALGORITHMS['xxh64'] = xxhash.xxh64
+    _ALGORITHMS['xxh3_64'] = xxhash.xxh3_64
+if blake3 is not None:
+    _ALGORITHMS['blake3'] = blake3.blake3
+
+_local = threading.local()
+
+BLOCK_SIZE = 1024 * 1024  # granularité des CRC par bloc de BlockDigest
+
+
+def available_algorithms():
+    return sorted(_ALGORITHMS)
+
+
+def new_hasher(algorithm=DEFAULT_ALGORITHM):
+    try:
+        return _ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Algorithme de hachage inconnu: {algorithm}") from None
+
+
+def _buffer(size):
+    # Un tampon par thread : la mémoire reste constante quelle que soit la taille des fichiers
+    buf = getattr(_local, 'buffer', None)
+    if buf is None or len(buf) != size:
+        buf = bytearray(size)
+        _local.buffer = buf
+    return buf
+
+
+def hash_stream(f, hasher, buffer_size=BUFFER_SIZE, progress=None):
+    buf = _buffer(buffer_size)
+    view = memoryview(buf)
+    done = 0
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        hasher.update(view[:n])
+        done += n
+        if progress:
+            progress(done)
+    return done
+
+
+def _hash_mmap(f, hasher, size, buffer_size, progress):
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            for offset in range(0, size, buffer_size):
+                hasher.update(view[offset:offset + buffer_size])
+                if progress:
+                    progress(min(offset + buffer_size, size))
+
+
+def hash_file(filepath, algorithm=DEFAULT_ALGORITHM, buffer_size=BUFFER_SIZE,
+              use_mmap=False, progress=None):
+    """Calcule l'empreinte d'un fichier par blocs, sans le charger en mémoire.
+
+    `progress` est appelé avec le nombre d'octets déjà hachés.
+    """
+    hasher = new_hasher(algorithm)
+    with open(filepath, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size > 0:
+            _hash_mmap(f, hasher, size, buffer_size, progress)
+        else:
+            hash_stream(f, hasher, buffer_size, progress)
+    return hasher.hexdigest()
+
+
+class BlockDigest:
+    """Empreinte d'un flux alimenté par morceaux, avec en plus un CRC32 par bloc.
+
+    Les CRC par bloc permettent de vérifier tout ou partie d'une copie en ne
+    relisant qu'un seul des deux fichiers.
+    """
+
+    def __init__(self, algorithm=DEFAULT_ALGORITHM, block_size=BLOCK_SIZE):
+        self.algorithm = algorithm
+        self.block_size = block_size
+        self.hasher = new_hasher(algorithm)
+        self.blocks = array('L')
+        self.size = 0
+        self._crc = 0
+        self._pending = 0  # octets déjà comptés dans le bloc en cours
+
+    def update(self, data):
+        self.hasher.update(data)
+        view = memoryview(data)
+        self.size += len(view)
+        while view:
+            take = min(len(view), self.block_size - self._pending)
+            self._crc = zlib.crc32(view[:take], self._crc)
+            self._pending += take
+            view = view[take:]
+            if self._pending == self.block_size:
+                self.blocks.append(self._crc)
+                self._crc = 0
+                self._pending = 0
+
+    def block_crcs(self):
+        if self._pending:
+            return self.blocks + array('L', [self._crc])
+        return self.blocks
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from .config import config_path
+from .log_store import entry_name
+
+MAX_BYTES = 64 * 1024 * 1024
+BACKUPS = 5
+
+
+def new_run_id():
+    return datetime.now().strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+
+
+class SyncJournal:
+    """Journal persistant des synchronisations (SQLite), avec rotation par taille.
+
+    journal.db reçoit les nouvelles entrées ; au-delà de `max_bytes` il devient
+    journal.1.db (puis .2, ... jusqu'à `backups`). Les recherches parcourent tous
+    les fichiers, du plus ancien au plus récent.
+    """
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path or config_path('journal.db')
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._runs = {}
+        self._conn = self._open(self.path)
+
+    def _open(self, path):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL : les lectures de l'historique ne bloquent pas l'écriture du journal
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                run_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                name TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_name ON entries (name);
+            CREATE INDEX IF NOT EXISTS entries_run ON entries (run_id);
+            CREATE INDEX IF NOT EXISTS entries_type ON entries (type);
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started TEXT NOT NULL,
+                finished TEXT,
+                mappings INTEGER NOT NULL
+            );
+        """)
+        return conn
+
+    def _rotated(self, i):
+        base, ext = os.path.splitext(self.path)
+        return f"{base}.{i}{ext}"
+
+    def _files(self):
+        # Du plus ancien au plus récent
+        rotated = [self._rotated(i) for i in range(self.backups, 0, -1)]
+        return [p for p in rotated if os.path.exists(p)] + [self.path]
+
+    def _rotate(self):
+        self._conn.close()
+        if os.path.exists(self._rotated(self.backups)):
+            os.remove(self._rotated(self.backups))
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(self._rotated(i)):
+                os.replace(self._rotated(i), self._rotated(i + 1))
+        os.replace(self.path, self._rotated(1))
+        self._conn = self._open(self.path)
+
+    def _save_run(self, run_id):
+        started, finished, mappings = self._runs[run_id]
+        self._conn.execute('INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)',
+                           (run_id, started, finished, mappings))
+        self._conn.commit()
+
+    def start_run(self, run_id, mappings):
+        with self._lock:
+            self._runs[run_id] = (datetime.now().isoformat(), None, mappings)
+            self._save_run(run_id)
+
+    def finish_run(self, run_id):
+        with self._lock:
+            started, _, mappings = self._runs[run_id]
+            self._runs[run_id] = (started, datetime.now().isoformat(), mappings)
+            self._save_run(run_id)
+            del self._runs[run_id]
+
+    def write(self, run_id, entries):
+        """Ajoute un lot d'entrées en une seule transaction."""
+        rows = [(run_id, e['type'], entry_name(e), e['timestamp'],
+                 json.dumps(e, ensure_ascii=False)) for e in entries]
+        with self._lock:
+            self._conn.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?)', rows)
+            self._conn.commit()
+            if os.path.getsize(self.path) > self.max_bytes:
+                self._rotate()
+                # Une session à cheval sur deux fichiers reste visible dans le nouveau
+                for active in self._runs:
+                    self._save_run(active)
+
+    def query(self, name=None, run_id=None, entry_type=None, limit=None):
+        """Entrées correspondant aux critères, de la plus ancienne à la plus récente."""
+        clauses, params = [], []
+        for column, value in (('name', name), ('run_id', run_id), ('type', entry_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        sql = 'SELECT data FROM entries'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY rowid'
+        count = 0
+        for path in self._files():
+            conn = sqlite3.connect(path)
+            try:
+                for (data,) in conn.execute(sql, params):
+                    yield json.loads(data)
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+            finally:
+                conn.close()
+
+    def first_arrival(self, name):
+        """Première copie connue d'un fichier (nom relatif à la source)."""
+        for entry in self.query(name=name):
+            if entry['type'] in ('copied', 'renamed'):
+                return entry
+        return None
+
+    def runs(self):
+        """Sessions connues, de la plus récente à la plus ancienne."""
+        found = {}
+        for path in self._files():
+            conn = sqlite3.connect(path)
+            try:
+                for run_id, started, finished, mappings in conn.execute(
+                        'SELECT run_id, started, finished, mappings FROM runs'):
+                    previous = found.get(run_id)
+                    found[run_id] = {
+                        'run_id': run_id,
+                        'started': previous['started'] if previous else started,
+                        'finished': finished or (previous or {}).get('finished'),
+                        'mappings': mappings
+                    }
+            finally:
+                conn.close()
+        return sorted(found.values(), key=lambda r: r['started'], reverse=True)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
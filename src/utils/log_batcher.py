@@ -0,0 +1,57 @@
+import threading
+
+BATCH_SIZE = 500
+BATCH_DELAY = 0.25  # secondes
+
+
+class LogBatcher:
+    """Regroupe les entrées du journal et les transmet par listes.
+
+    Un lot part dès qu'il atteint `max_size` entrées ou que sa plus ancienne entrée
+    attend depuis `max_delay` secondes ; `close` envoie le reste.
+    """
+
+    def __init__(self, emit_batch, max_size=BATCH_SIZE, max_delay=BATCH_DELAY):
+        self.emit_batch = emit_batch
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def add(self, entry):
+        with self._cond:
+            self._pending.append(entry)
+            if len(self._pending) == 1:
+                self._cond.notify()
+            if len(self._pending) < self.max_size:
+                return
+            batch, self._pending = self._pending, []
+        self.emit_batch(batch)
+
+    def flush(self):
+        with self._cond:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.emit_batch(batch)
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            # Laisser le lot se remplir avant l'envoi
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed, timeout=self.max_delay)
+            self.flush()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
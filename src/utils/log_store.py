@@ -0,0 +1,142 @@
+import json
+import tempfile
+from array import array
+from datetime import datetime
+from functools import lru_cache
+
+ENTRY_TYPES = ['copied', 'renamed', 'error']
+MAX_IN_MEMORY = 200_000
+
+
+def entry_name(entry):
+    return entry.get('name') or entry.get('original_name') or entry.get('file') or ''
+
+
+def _entry_detail(entry):
+    if entry['type'] == 'error':
+        return entry.get('error', '')
+    if entry['type'] == 'renamed':
+        return entry.get('new_name', '')
+    return ''
+
+
+class LogStore:
+    """Entrées du journal rangées par colonnes, les plus anciennes déversées sur disque.
+
+    Les numéros de ligne sont stables : les lignes [0, spilled) sont lues dans le
+    fichier de débordement, les suivantes en mémoire. Le type (un octet par ligne)
+    reste toujours en mémoire pour filtrer sans lire le disque.
+    """
+
+    def __init__(self, max_in_memory=MAX_IN_MEMORY):
+        self.max_in_memory = max(1, max_in_memory)
+        self._spill = None
+        self.clear()
+
+    def clear(self):
+        if self._spill is not None:
+            self._spill.close()
+        self.spilled = 0
+        self._spill = None
+        self._offsets = array('q')
+        self._timestamps = array('d')
+        self._types = array('B')  # toutes les lignes, y compris déversées
+        self._names = []
+        self._details = []
+        self._sources = []
+        self._destinations = []
+        self._read_spilled = lru_cache(maxsize=1024)(self._read_spilled_row)
+
+    def __len__(self):
+        return len(self._types)
+
+    def type_code(self, entry_type):
+        if entry_type not in ENTRY_TYPES:
+            ENTRY_TYPES.append(entry_type)
+        return ENTRY_TYPES.index(entry_type)
+
+    def append(self, entry):
+        self._timestamps.append(datetime.fromisoformat(entry['timestamp']).timestamp())
+        self._types.append(self.type_code(entry['type']))
+        self._names.append(entry_name(entry))
+        self._details.append(_entry_detail(entry))
+        self._sources.append(entry.get('source', ''))
+        self._destinations.append(entry.get('destination', ''))
+        if len(self._names) > self.max_in_memory:
+            self._spill_oldest(len(self._names) - self.max_in_memory // 2)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def _spill_oldest(self, count):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix='sync_journal_')
+        self._spill.seek(0, 2)
+        for i in range(count):
+            self._offsets.append(self._spill.tell())
+            row = [self._timestamps[i], self._types[self.spilled + i], self._names[i],
+                   self._details[i], self._sources[i], self._destinations[i]]
+            self._spill.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b'\n')
+        for column in (self._timestamps, self._names,
+                       self._details, self._sources, self._destinations):
+            del column[:count]
+        self.spilled += count
+
+    def _read_spilled_row(self, row):
+        self._spill.seek(self._offsets[row])
+        return json.loads(self._spill.readline())
+
+    def row(self, row):
+        """(timestamp, type, nom, détail, source, destination) de la ligne `row`."""
+        if row < self.spilled:
+            return tuple(self._read_spilled(row))
+        i = row - self.spilled
+        return (self._timestamps[i], self._types[row], self._names[i],
+                self._details[i], self._sources[i], self._destinations[i])
+
+    def entry_type(self, row):
+        return ENTRY_TYPES[self._types[row]]
+
+    def _spilled_rows(self):
+        if self._spill is None:
+            return
+        self._spill.seek(0)
+        for row, line in enumerate(self._spill):
+            yield row, line
+
+    def matches(self, row, types=None, text=None):
+        values = self.row(row)
+        if types is not None and ENTRY_TYPES[values[1]] not in types:
+            return False
+        if text:
+            return any(text in str(v).lower() for v in values[2:])
+        return True
+
+    def find(self, types=None, text=None):
+        """Numéros des lignes correspondant aux types et au texte (insensible à la casse)."""
+        text = (text or '').lower()
+        codes = None if types is None else {self.type_code(t) for t in types}
+        if not text:
+            return array('q', (row for row, code in enumerate(self._types)
+                               if codes is None or code in codes))
+        result = array('q')
+        # Les lignes sur disque sont du JSON : barres obliques inverses et guillemets y sont échappés
+        needle = json.dumps(text, ensure_ascii=False)[1:-1]
+        # Sur disque : lecture séquentielle, décodage des seules lignes candidates
+        for row, line in self._spilled_rows():
+            if codes is not None and self._types[row] not in codes:
+                continue
+            if needle not in line.decode('utf-8').lower():
+                continue
+            if any(text in str(v).lower() for v in json.loads(line)[2:]):
+                result.append(row)
+        for i in range(len(self._names)):
+            row = self.spilled + i
+            if codes is not None and self._types[row] not in codes:
+                continue
+            if (text in self._names[i].lower() or text in self._details[i].lower()
+                    or text in self._sources[i].lower()
+                    or text in self._destinations[i].lower()):
+                result.append(row)
+        return result
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+import threading
+from .config import config_path
+
+MANIFEST_DIR = 'manifests'
+
+
+class SourceManifest:
+    """Taille et date des fichiers source traités lors du dernier passage complet d'un mapping.
+
+    Un fichier dont le scan donne la même taille et la même date est considéré
+    comme déjà synchronisé : il n'est ni comparé ni copié, à condition que sa
+    copie soit toujours présente à la destination. Le nom de cette copie est
+    noté quand il diffère (conflit renommé). Le nouvel instantané ne contient
+    que les fichiers traités sans erreur pendant ce passage.
+    """
+
+    def __init__(self, mapping, directory=None, load=True):
+        directory = directory or config_path(MANIFEST_DIR)
+        os.makedirs(directory, exist_ok=True)
+        key = f"{mapping.source}\n{mapping.destination}".encode('utf-8')
+        self.path = os.path.join(directory, hashlib.sha1(key).hexdigest()[:16] + '.json')
+        self.previous = self._load() if load else {}
+        self.current = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return {name: tuple(value) for name, value in json.load(f)['files'].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def carry_over(self):
+        """Passage partiel (mode surveillance) : les fichiers non rescannés restent acquis."""
+        with self._lock:
+            self.current = {**self.previous, **self.current}
+
+    def unchanged(self, entry):
+        return self.previous.get(entry.relpath, ())[:2] == (entry.stat.st_size, entry.stat.st_mtime_ns)
+
+    def destination(self, relpath):
+        """Chemin relatif de la copie de `relpath` lors du dernier passage."""
+        value = self.previous.get(relpath, ())
+        return value[2] if len(value) > 2 else relpath
+
+    def record(self, entry, destination=None):
+        value = (entry.stat.st_size, entry.stat.st_mtime_ns)
+        if destination is not None and destination != entry.relpath:
+            value += (destination,)
+        with self._lock:
+            self.current[entry.relpath] = value
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with self._lock:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'files': self.current}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
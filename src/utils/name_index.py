@@ -0,0 +1,93 @@
+import os
+import threading
+
+
+def split_version(name):
+    # photo_012.jpg -> ('photo', 12, '.jpg') ; photo.jpg -> ('photo', 0, '.jpg')
+    stem, ext = os.path.splitext(name)
+    base, sep, suffix = stem.rpartition('_')
+    if sep and len(suffix) >= 3 and suffix.isdigit():
+        return base, int(suffix), ext
+    return stem, 0, ext
+
+
+class _Listing:
+    def __init__(self, names):
+        self.names = set()
+        self.versions = {}  # (base, ext) -> {numéro: nom} des variantes base_NNN
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        self.names.add(os.path.normcase(name))
+        base, number, ext = split_version(name)
+        if number:
+            key = (os.path.normcase(base), os.path.normcase(ext))
+            self.versions.setdefault(key, {})[number] = name
+
+
+class DestinationIndex:
+    """Noms présents dans les dossiers de destination, lus une seule fois par dossier.
+
+    Existence et prochain suffixe libre sont résolus en mémoire, sans stat, et
+    l'index est mis à jour à chaque nom attribué.
+    """
+
+    def __init__(self):
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def _listing(self, directory):
+        listing = self._dirs.get(directory)
+        if listing is None:
+            try:
+                with os.scandir(directory) as it:
+                    names = [entry.name for entry in it]
+            except FileNotFoundError:
+                names = []
+            with self._lock:
+                listing = self._dirs.setdefault(directory, _Listing(names))
+        return listing
+
+    def exists(self, path):
+        directory, name = os.path.split(path)
+        listing = self._listing(directory)
+        with self._lock:
+            return os.path.normcase(name) in listing.names
+
+    def claim(self, path):
+        """Attribue `path` s'il est libre ; renvoie False s'il est déjà pris."""
+        directory, name = os.path.split(path)
+        listing = self._listing(directory)
+        with self._lock:
+            if os.path.normcase(name) in listing.names:
+                return False
+            listing.add(name)
+            return True
+
+    def versions(self, path):
+        """Noms existants de `path` et de ses variantes base_NNN, du plus ancien au plus récent."""
+        directory, name = os.path.split(path)
+        base, ext = os.path.splitext(name)
+        listing = self._listing(directory)
+        with self._lock:
+            found = listing.versions.get((os.path.normcase(base), os.path.normcase(ext)), {})
+            names = [found[n] for n in sorted(found)]
+            if os.path.normcase(name) in listing.names:
+                names.insert(0, name)
+        return [os.path.join(directory, n) for n in names]
+
+    def claim_next_version(self, path):
+        """Attribue le premier nom base_NNN au-delà du plus grand suffixe existant."""
+        directory, name = os.path.split(path)
+        base, ext = os.path.splitext(name)
+        listing = self._listing(directory)
+        with self._lock:
+            found = listing.versions.get((os.path.normcase(base), os.path.normcase(ext)), {})
+            counter = max(found, default=0) + 1
+            while True:
+                new_name = f"{base}_{counter:03d}{ext}"
+                if os.path.normcase(new_name) not in listing.names:
+                    listing.add(new_name)
+                    return os.path.join(directory, new_name)
+                counter += 1
@@ -0,0 +1,72 @@
+import json
+import os
+import zlib
+from .hashing import BUFFER_SIZE
+
+PARTIAL_SUFFIX = '.partial'
+CHECKPOINT_SUFFIX = '.partial.json'
+CHECKPOINT_INTERVAL = 64 * 1024 * 1024  # octets écrits entre deux points de reprise
+
+
+def partial_path(destination):
+    return destination + PARTIAL_SUFFIX
+
+
+def checkpoint_path(destination):
+    return destination + CHECKPOINT_SUFFIX
+
+
+def save_checkpoint(destination, source, source_st, offset, crc):
+    """Enregistre le point de reprise d'une copie ; les données doivent déjà être sur le disque."""
+    state = {
+        'source': source,
+        'size': source_st.st_size,
+        'mtime_ns': source_st.st_mtime_ns,
+        'offset': offset,
+        'crc32': crc
+    }
+    path = checkpoint_path(destination)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def clear_checkpoint(destination):
+    try:
+        os.remove(checkpoint_path(destination))
+    except OSError:
+        pass
+
+
+def load_checkpoint(destination, source, source_st, digest=None):
+    """Point de reprise d'une copie interrompue, ou (0, 0) s'il est absent ou périmé.
+
+    La source doit être inchangée (taille et date) et le début du fichier partiel
+    doit correspondre au CRC enregistré. Ce début est relu une fois, ce qui
+    alimente aussi `digest` ; la source n'est pas relue.
+    Renvoie (offset, crc32 des `offset` premiers octets).
+    """
+    try:
+        with open(checkpoint_path(destination), encoding='utf-8') as f:
+            state = json.load(f)
+        if (state['source'], state['size'], state['mtime_ns']) != \
+                (source, source_st.st_size, source_st.st_mtime_ns):
+            return 0, 0
+        offset = state['offset']
+        crc = 0
+        remaining = offset
+        with open(partial_path(destination), 'rb') as f:
+            while remaining:
+                chunk = f.read(min(remaining, BUFFER_SIZE))
+                if not chunk:
+                    return 0, 0
+                crc = zlib.crc32(chunk, crc)
+                if digest is not None:
+                    digest.update(chunk)
+                remaining -= len(chunk)
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0, 0
+    if crc != state['crc32']:
+        return 0, 0
+    return offset, crc
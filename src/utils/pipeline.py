@@ -0,0 +1,310 @@
+import itertools
+import os
+import queue
+import shutil
+import threading
+import zlib
+from .partial import (CHECKPOINT_INTERVAL, clear_checkpoint, load_checkpoint,
+                      partial_path, save_checkpoint)
+
+CHUNK_SIZE = 4 * 1024 * 1024
+_DONE = object()
+
+
+class CopyTask:
+    def __init__(self, item, source, destination, **info):
+        self.item = item
+        self.source = source
+        self.destination = destination
+        self.info = info
+        self.written = 0
+        self.method = None
+        self.digest = None  # None pour une copie par le noyau non vérifiée
+        self.hashed = None  # fichier lu pour calculer `digest` (source ou destination)
+        self.source_st = None
+        self.offset = 0  # reprise d'une copie interrompue
+        self.crc = 0  # CRC des octets écrits, pour les points de reprise
+        self.checkpoint = 0  # octets couverts par le dernier point de reprise
+        self.failed = False  # écriture en échec : le lecteur arrête de lire la source
+
+
+class CopyPipeline:
+    """Scan -> lecture -> écriture, reliés par des files bornées.
+
+    Les lecteurs décident du sort de chaque élément via `prepare` (qui renvoie une
+    CopyTask ou None s'il n'y a rien à copier) puis lisent la source par blocs ;
+    les écrivains écrivent ces blocs pendant que les lecteurs avancent sur les
+    fichiers suivants. La mémoire reste bornée à queue_depth * chunk_size par écrivain.
+
+    Avec un `backend` (CopyBackend), les fichiers dont la copie peut passer par le
+    noyau sont copiés directement par le lecteur, sans transiter par les files.
+
+    Avec `new_digest` (fabrique de BlockDigest), l'empreinte est calculée pendant la
+    copie sur les blocs lus de la source. Une copie par le noyau ne fait transiter
+    aucun bloc : après un reflink, ou un copy_file_range sur le même volume, rien
+    n'est en cache et relire la destination coûterait une lecture complète. Son
+    empreinte n'est donc calculée, en relisant la destination, que si `verify` est
+    demandé ; sinon task.digest reste None. `verify(task)` est appelé sur chaque
+    fichier terminé ; une exception supprime la copie et passe par `on_error`.
+
+    Les copies s'écrivent dans un fichier .partial renommé à la fin. Pour les gros
+    fichiers, un point de reprise est enregistré tous les `checkpoint_interval`
+    octets, par les écrivains comme par les copies noyau : une copie interrompue
+    reprend au passage suivant si la source n'a pas changé.
+
+    `check` est appelé entre deux blocs lus, copiés ou hachés (pause, annulation) ;
+    une exception levée par `check` interrompt le fichier en cours.
+
+    `on_error` reçoit l'élément si `prepare` échoue, la CopyTask si la copie échoue.
+    """
+
+    def __init__(self, prepare, on_copied, on_error, readers=2, writers=1,
+                 queue_depth=8, chunk_size=CHUNK_SIZE, on_bytes=None, backend=None,
+                 new_digest=None, verify=None, checkpoint_interval=CHECKPOINT_INTERVAL,
+                 check=None):
+        self.prepare = prepare
+        self.on_copied = on_copied
+        self.on_error = on_error
+        self.on_bytes = on_bytes
+        self.backend = backend
+        self.new_digest = new_digest
+        self.verify = verify
+        self.checkpoint_interval = checkpoint_interval
+        self.check = check
+        self.readers = max(1, readers)
+        self.writers = max(1, writers)
+        self.queue_depth = max(1, queue_depth)
+        self.chunk_size = chunk_size
+        self._next_writer = itertools.count()
+        self._lock = threading.Lock()
+
+    def run(self, items):
+        work = queue.Queue(maxsize=self.queue_depth)
+        outs = [queue.Queue(maxsize=self.queue_depth) for _ in range(self.writers)]
+        readers = [threading.Thread(target=self._read_loop, args=(work, outs), daemon=True)
+                   for _ in range(self.readers)]
+        writers = [threading.Thread(target=self._write_loop, args=(out,), daemon=True)
+                   for out in outs]
+        for t in readers + writers:
+            t.start()
+        try:
+            for item in items:
+                work.put(item)
+        finally:
+            for _ in readers:
+                work.put(_DONE)
+            for t in readers:
+                t.join()
+            for out in outs:
+                out.put(_DONE)
+            for t in writers:
+                t.join()
+
+    def _pick_writer(self, outs):
+        # Tous les blocs d'un même fichier passent par le même écrivain, dans l'ordre
+        with self._lock:
+            return outs[next(self._next_writer) % len(outs)]
+
+    def _read_loop(self, work, outs):
+        while True:
+            item = work.get()
+            if item is _DONE:
+                return
+            try:
+                task = self.prepare(item)
+            except Exception as e:
+                self.on_error(item, e)
+                continue
+            if task is None:
+                continue
+
+            if self.backend is not None and self.backend.accelerated(task.source, task.destination):
+                self._copy_direct(task)
+                continue
+
+            out = self._pick_writer(outs)
+            if self.new_digest is not None:
+                task.digest = self.new_digest()
+                task.hashed = task.source
+            try:
+                with open(task.source, 'rb') as f:
+                    self._resume(task, os.fstat(f.fileno()))
+                    if task.offset:
+                        f.seek(task.offset)
+                    while True:
+                        if task.failed:
+                            # Destination pleine ou refusée : inutile de finir de lire la source
+                            break
+                        chunk = f.read(self.chunk_size)
+                        if not chunk:
+                            break
+                        if self.check:
+                            self.check()
+                        if task.digest is not None:
+                            task.digest.update(chunk)
+                        out.put((task, chunk))
+            except Exception as e:
+                out.put((task, e))
+            else:
+                out.put((task, None))
+
+    def _resume(self, task, st):
+        task.source_st = st
+        if st.st_size < self.checkpoint_interval:
+            return
+        offset, crc = load_checkpoint(task.destination, task.source, st, task.digest)
+        if not offset:
+            if task.digest is not None:
+                task.digest = self.new_digest()
+            return
+        # Le début déjà copié lors d'un passage précédent n'est pas relu sur la source
+        task.offset = task.written = task.checkpoint = offset
+        task.crc = crc
+        if self.on_bytes:
+            self.on_bytes(task, offset)
+
+    def _copy_direct(self, task):
+        partial = partial_path(task.destination)
+        readback = None
+
+        def read_back(upto):
+            # Relit la partie copiée depuis la dernière relecture : empreinte et CRC du point de reprise
+            nonlocal readback
+            if readback is None:
+                readback = open(partial, 'rb', buffering=0)
+                readback.seek(task.offset)
+            remaining = upto - readback.tell()
+            while remaining > 0:
+                chunk = readback.read(min(remaining, self.chunk_size))
+                if not chunk:
+                    break
+                if task.digest is not None:
+                    task.digest.update(chunk)
+                if checkpointed:
+                    task.crc = zlib.crc32(chunk, task.crc)
+                remaining -= len(chunk)
+
+        def progress(n):
+            task.written += n
+            if task.digest is not None:
+                read_back(task.written)
+            # Un reflink arrive en une fois à la fin : pas de point de reprise, donc rien à relire
+            if checkpointed and task.written < task.source_st.st_size and \
+                    task.written - task.checkpoint >= self.checkpoint_interval:
+                read_back(task.written)
+                os.fsync(readback.fileno())
+                save_checkpoint(task.destination, task.source, task.source_st,
+                                task.written, task.crc)
+                task.checkpoint = task.written
+            if self.on_bytes:
+                self.on_bytes(task, n)
+            if self.check:
+                self.check()
+
+        try:
+            if self.new_digest is not None and self.verify is not None:
+                task.digest = self.new_digest()
+                task.hashed = task.destination
+            self._resume(task, os.stat(task.source))
+            checkpointed = task.source_st.st_size >= self.checkpoint_interval
+            try:
+                task.method = self.backend.copy(task.source, partial, progress, task.offset)
+            finally:
+                if readback is not None:
+                    readback.close()
+            self._check_complete(task)
+            os.replace(partial, task.destination)
+            if task.checkpoint:
+                clear_checkpoint(task.destination)
+        except Exception as e:
+            # Comme pour l'écrivain : un fichier partiel couvert par un point de reprise est gardé
+            if not task.checkpoint:
+                self._discard(partial)
+            self.on_error(task, e)
+        else:
+            self._finish(task)
+
+    def _check_complete(self, task):
+        # Une copie arrêtée trop tôt ne doit pas remplacer la destination sous son nom définitif
+        if task.written != task.source_st.st_size:
+            raise IOError(f"Copie incomplète, {task.written} octets écrits sur "
+                          f"{task.source_st.st_size}: {task.destination}")
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _finish(self, task):
+        try:
+            shutil.copystat(task.source, task.destination)
+            if self.verify is not None:
+                self.verify(task)
+        except Exception as e:
+            self._discard(task.destination)
+            self.on_error(task, e)
+            return
+        try:
+            self.on_copied(task)
+        except Exception as e:
+            self.on_error(task, e)
+
+    def _open_partial(self, task):
+        task.method = 'buffered'
+        path = partial_path(task.destination)
+        if not task.offset:
+            return open(path, 'wb')
+        f = open(path, 'r+b')
+        f.seek(task.offset)
+        f.truncate()
+        return f
+
+    def _save_checkpoint(self, task, f):
+        # Les données doivent être sur le disque avant le point de reprise qui les couvre
+        f.flush()
+        os.fsync(f.fileno())
+        save_checkpoint(task.destination, task.source, task.source_st, task.written, task.crc)
+        task.checkpoint = task.written
+
+    def _write_loop(self, out):
+        handles = {}
+        while True:
+            msg = out.get()
+            if msg is _DONE:
+                return
+            task, data = msg
+            if task.failed:
+                continue
+            try:
+                f = handles.get(task)
+                if f is None:
+                    f = handles[task] = self._open_partial(task)
+                if isinstance(data, Exception):
+                    raise data
+                if data is None:
+                    self._check_complete(task)
+                    del handles[task]
+                    f.close()
+                    os.replace(partial_path(task.destination), task.destination)
+                    if task.checkpoint:
+                        clear_checkpoint(task.destination)
+                    self._finish(task)
+                else:
+                    f.write(data)
+                    task.written += len(data)
+                    if task.source_st.st_size >= self.checkpoint_interval:
+                        task.crc = zlib.crc32(data, task.crc)
+                        if task.written - task.checkpoint >= self.checkpoint_interval:
+                            self._save_checkpoint(task, f)
+                    if self.on_bytes:
+                        self.on_bytes(task, len(data))
+            except Exception as e:
+                f = handles.pop(task, None)
+                if f is not None:
+                    f.close()
+                    # Un fichier partiel couvert par un point de reprise est gardé pour le passage suivant
+                    if not task.checkpoint:
+                        self._discard(partial_path(task.destination))
+                task.failed = True
+                self.on_error(task, e)
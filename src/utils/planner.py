@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+import threading
+from .progress import format_bytes
+from .scheduler import device_id
+
+ACTIONS = ('new', 'identical', 'rename', 'skip')
+ACTION_LABELS = {
+    'new': "nouveaux",
+    'identical': "identiques",
+    'rename': "conflits renommés",
+    'skip': "inchangés"
+}
+COPY_ACTIONS = ('new', 'rename')
+
+
+class PlannedFile:
+    __slots__ = ('entry', 'action', 'destination')
+
+    def __init__(self, entry, action, destination=None):
+        self.entry = entry
+        self.action = action
+        self.destination = destination
+
+
+def _existing_parent(path):
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+class SyncPlan:
+    """Résultat d'une analyse sans copie : le sort prévu de chaque fichier source.
+
+    Rempli par SyncEngine(dry_run=plan), puis exécuté par SyncEngine(plan=plan)
+    sans nouveau scan ni nouvelle comparaison.
+    """
+
+    def __init__(self, mappings):
+        self.mappings = mappings
+        self.files = {idx: [] for idx in range(len(mappings))}
+        self.errors = {idx: [] for idx in range(len(mappings))}
+        self._lock = threading.Lock()
+
+    def add(self, idx, entry, action, destination=None):
+        with self._lock:
+            self.files[idx].append(PlannedFile(entry, action, destination))
+
+    def add_error(self, idx, relpath, error):
+        with self._lock:
+            self.errors[idx].append((relpath, str(error)))
+
+    def entries(self, idx):
+        return sorted(self.files[idx], key=lambda f: f.entry.relpath)
+
+    def totals(self, idx):
+        """{action: (nombre de fichiers, octets)} pour un mapping."""
+        totals = {action: [0, 0] for action in ACTIONS}
+        for planned in self.files[idx]:
+            totals[planned.action][0] += 1
+            totals[planned.action][1] += planned.entry.stat.st_size
+        return {action: tuple(value) for action, value in totals.items()}
+
+    def bytes_to_copy(self, idx):
+        totals = self.totals(idx)
+        return sum(totals[action][1] for action in COPY_ACTIONS)
+
+    def volumes(self):
+        """Octets à écrire et espace libre par volume de destination."""
+        volumes = {}
+        for idx, mapping in enumerate(self.mappings):
+            root = _existing_parent(mapping.destination)
+            volume = volumes.setdefault(device_id(mapping.destination), {
+                'path': root,
+                'required': 0,
+                'free': None,
+                'mappings': []
+            })
+            volume['required'] += self.bytes_to_copy(idx)
+            volume['mappings'].append(idx)
+        for volume in volumes.values():
+            try:
+                volume['free'] = shutil.disk_usage(volume['path']).free
+            except OSError:
+                pass
+        return volumes
+
+    def preflight(self):
+        """Messages d'erreur si un volume de destination n'a pas assez de place."""
+        problems = []
+        for volume in self.volumes().values():
+            if volume['free'] is not None and volume['required'] > volume['free']:
+                problems.append(
+                    f"Espace insuffisant sur {volume['path']}: "
+                    f"{format_bytes(volume['required'])} à copier, "
+                    f"{format_bytes(volume['free'])} disponibles"
+                )
+        return problems
+
+    def summary(self):
+        lines = []
+        for idx, mapping in enumerate(self.mappings):
+            totals = self.totals(idx)
+            lines.append(f"{mapping.source} → {mapping.destination}")
+            for action in ACTIONS:
+                count, size = totals[action]
+                if count:
+                    lines.append(f"  {ACTION_LABELS[action]}: {count} ({format_bytes(size)})")
+            if self.errors[idx]:
+                lines.append(f"  erreurs: {len(self.errors[idx])}")
+        for volume in self.volumes().values():
+            free = format_bytes(volume['free']) if volume['free'] is not None else "inconnu"
+            lines.append(f"Volume {volume['path']}: {format_bytes(volume['required'])} à copier, {free} libres")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            'mappings': [
+                {
+                    'source': mapping.source,
+                    'destination': mapping.destination,
+                    'totals': {action: {'files': count, 'bytes': size}
+                               for action, (count, size) in self.totals(idx).items()},
+                    'files': [
+                        {
+                            'name': planned.entry.relpath,
+                            'size': planned.entry.stat.st_size,
+                            'action': planned.action,
+                            'destination': planned.destination
+                        }
+                        for planned in self.entries(idx)
+                    ],
+                    'errors': [{'name': name, 'error': error} for name, error in self.errors[idx]]
+                }
+                for idx, mapping in enumerate(self.mappings)
+            ],
+            'volumes': [
+                {
+                    'path': volume['path'],
+                    'required': volume['required'],
+                    'free': volume['free'],
+                    'mappings': volume['mappings']
+                }
+                for volume in self.volumes().values()
+            ],
+            'problems': self.preflight()
+        }
+
+    def save_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,136 @@
+import dataclasses
+import threading
+import time
+from ..models.folder_pair import Progress
+
+EMIT_INTERVAL = 0.1  # au plus 10 mises à jour par seconde et par barre
+SMOOTHING = 0.2
+
+
+def format_bytes(n):
+    if n < 1024:
+        return f"{n:.0f} o"
+    for unit in ('Ko', 'Mo', 'Go'):
+        n /= 1024
+        if n < 1024 or unit == 'Go':
+            return f"{n:.1f} {unit}"
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds} s"
+    if seconds < 3600:
+        return f"{seconds // 60} min {seconds % 60:02d} s"
+    return f"{seconds // 3600} h {seconds % 3600 // 60:02d} min"
+
+
+def format_progress(progress):
+    text = f"{progress.current}/{progress.total} fichiers"
+    if progress.bytes_total:
+        text += f" · {format_bytes(progress.bytes_done)}/{format_bytes(progress.bytes_total)}"
+    if progress.status == 'syncing' and progress.rate:
+        text += f" · {format_bytes(progress.rate)}/s"
+        if progress.eta is not None:
+            text += f" · reste {format_duration(progress.eta)}"
+    return text
+
+
+class _Meter:
+    def __init__(self, progress):
+        self.progress = progress
+        self.last_emit = None
+        self.last_bytes = 0
+
+    def measure(self, now):
+        # Débit et temps restant ne tiennent compte que des octets copiés : sauter des
+        # fichiers identiques ne fait pas grimper le débit
+        p = self.progress
+        if self.last_emit is not None and now > self.last_emit:
+            p.instant_rate = (p.bytes_transferred - self.last_bytes) / (now - self.last_emit)
+            p.rate = p.instant_rate if not p.rate else \
+                SMOOTHING * p.instant_rate + (1 - SMOOTHING) * p.rate
+        remaining = p.bytes_total - p.bytes_done
+        p.eta = remaining / p.rate if p.rate > 0 else None
+        self.last_emit = now
+        self.last_bytes = p.bytes_transferred
+        return dataclasses.replace(p)
+
+
+class ProgressAggregator:
+    """Compte fichiers et octets par mapping et au total, et limite la fréquence des émissions.
+
+    Les callbacks reçoivent des copies : l'objet transmis au thread graphique n'est
+    plus modifié ensuite.
+    """
+
+    def __init__(self, on_mapping, on_overall=None, interval=EMIT_INTERVAL, clock=time.monotonic):
+        self.on_mapping = on_mapping
+        self.on_overall = on_overall
+        self.interval = interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._meters = {}
+        self._overall = _Meter(Progress(status='syncing'))
+
+    def _update(self, idx, change, force=False):
+        with self._lock:
+            meter = self._meters.get(idx)
+            if meter is None:
+                meter = self._meters[idx] = _Meter(Progress(status='syncing'))
+            change(meter.progress, self._overall.progress)
+            now = self.clock()
+            snapshot = overall = None
+            if force or meter.last_emit is None or now - meter.last_emit >= self.interval:
+                snapshot = meter.measure(now)
+            if self._overall.last_emit is None or now - self._overall.last_emit >= self.interval:
+                overall = self._overall.measure(now)
+        if snapshot is not None:
+            self.on_mapping(idx, snapshot)
+        if overall is not None and self.on_overall:
+            self.on_overall(overall)
+
+    def start(self, idx):
+        self._update(idx, lambda p, o: None, force=True)
+
+    def add_file(self, idx, size):
+        self.add_files(idx, 1, size)
+
+    def add_files(self, idx, count, size):
+        def change(p, o):
+            p.total += count
+            o.total += count
+            p.bytes_total += size
+            o.bytes_total += size
+        self._update(idx, change)
+
+    def add_bytes(self, idx, n):
+        def change(p, o):
+            p.bytes_done += n
+            o.bytes_done += n
+            p.bytes_transferred += n
+            o.bytes_transferred += n
+        self._update(idx, change)
+
+    def file_done(self, idx, skipped_bytes=0):
+        # skipped_bytes : octets non copiés (fichier identique, erreur) comptés comme traités
+        skipped_bytes = max(0, skipped_bytes)
+
+        def change(p, o):
+            p.current += 1
+            o.current += 1
+            p.bytes_done += skipped_bytes
+            o.bytes_done += skipped_bytes
+        self._update(idx, change)
+
+    def finish(self, idx, status='completed'):
+        def change(p, o):
+            p.status = status
+        self._update(idx, change, force=True)
+
+    def close(self, status='completed'):
+        with self._lock:
+            self._overall.progress.status = status
+            overall = self._overall.measure(self.clock())
+        if self.on_overall:
+            self.on_overall(overall)
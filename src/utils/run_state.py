@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from .config import config_path
+
+RUN_STATE_FILE = 'run_state.json'
+FLUSH_INTERVAL = 1.0  # secondes entre deux écritures sur disque
+
+
+def mapping_key(mapping):
+    return f"{mapping.source}\n{mapping.destination}"
+
+
+class RunState:
+    """Avancement d'une synchronisation, pour reprendre une session interrompue.
+
+    Le fichier est un journal JSON lines en ajout seul : une ligne par fichier
+    traité et une par mapping terminé. Il survit donc à un arrêt brutal ; il est
+    supprimé quand une synchronisation se termine sans interruption.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config_path(RUN_STATE_FILE)
+        self.completed = set()  # clés des mappings terminés
+        self.done = {}  # clé du mapping -> chemins relatifs déjà traités
+        self._file = None
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=None):
+        """État laissé par une synchronisation interrompue (vide s'il n'y en a pas)."""
+        state = cls(path)
+        try:
+            with open(state.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un arrêt brutal
+                        continue
+                    if record.get('completed'):
+                        state.completed.add(record['mapping'])
+                    elif 'file' in record:
+                        state.done.setdefault(record['mapping'], set()).add(record['file'])
+        except FileNotFoundError:
+            pass
+        return state
+
+    def __bool__(self):
+        return bool(self.completed or self.done)
+
+    def matches(self, mappings):
+        """Vrai si l'état concerne au moins un de ces mappings."""
+        keys = {mapping_key(m) for m in mappings}
+        return any(key in keys for key in self.completed | set(self.done))
+
+    def is_completed(self, mapping):
+        return mapping_key(mapping) in self.completed
+
+    def done_files(self, mapping):
+        return self.done.get(mapping_key(mapping), set())
+
+    def _write(self, record, flush=False):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            now = time.monotonic()
+            if flush or now - self._last_flush >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._last_flush = now
+
+    def mark_file(self, mapping, relpath):
+        self._write({'mapping': mapping_key(mapping), 'file': relpath})
+
+    def mark_completed(self, mapping):
+        self.completed.add(mapping_key(mapping))
+        self._write({'mapping': mapping_key(mapping), 'completed': True}, flush=True)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        self.close()
+        self.completed.clear()
+        self.done.clear()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
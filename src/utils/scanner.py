@@ -0,0 +1,69 @@
+import os
+import stat
+
+
+class ScanEntry:
+    __slots__ = ('relpath', 'path', 'stat')
+
+    def __init__(self, relpath, path, stat):
+        self.relpath = relpath
+        self.path = path
+        self.stat = stat
+
+
+def scan_tree(root, on_error=None):
+    """Parcourt `root` récursivement et renvoie les fichiers au fil de l'eau.
+
+    Le stat fourni par DirEntry est réutilisé ; seule la pile des dossiers restant
+    à visiter est gardée en mémoire. Les liens symboliques vers des dossiers ne
+    sont pas suivis.
+    """
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                subdirs = []
+                for entry in it:
+                    relpath = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(relpath)
+                        elif entry.is_file():
+                            yield ScanEntry(relpath, entry.path, entry.stat())
+                    except OSError as e:
+                        if on_error:
+                            on_error(relpath, e)
+                # Ordre alphabétique des sous-dossiers conservé malgré la pile
+                pending.extend(sorted(subdirs, reverse=True))
+        except OSError as e:
+            if on_error:
+                on_error(rel_dir, e)
+
+
+
+def scan_paths(root, relpaths, on_error=None):
+    """Comme scan_tree, limité à une liste de chemins relatifs (fichiers ou dossiers).
+
+    Les chemins disparus entre-temps sont ignorés ; un dossier est parcouru en entier.
+    """
+    for relpath in sorted(set(relpaths)):
+        path = os.path.join(root, relpath)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            if on_error:
+                on_error(relpath, e)
+            continue
+        if not stat.S_ISDIR(st.st_mode):
+            yield ScanEntry(relpath, path, st)
+            continue
+
+        def subdir_error(rel, e, relpath=relpath):
+            if on_error:
+                on_error(os.path.join(relpath, rel), e)
+
+        for entry in scan_tree(path, on_error=subdir_error):
+            yield ScanEntry(os.path.join(relpath, entry.relpath), entry.path, entry.stat)
@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+REMOTE_FS = ('fuse', 'nfs', 'cifs', 'smb', '9p', 'sshfs')
+
+
+def device_id(path):
+    # La destination n'existe pas forcément encore : on remonte au premier parent existant
+    path = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return os.path.splitdrive(path)[0] or path
+            path = parent
+
+
+def filesystem_type(path):
+    """Type du système de fichiers contenant `path` d'après /proc/self/mounts ('' si inconnu)."""
+    path = os.path.realpath(path)
+    best, fstype = '', ''
+    try:
+        with open('/proc/self/mounts', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount = fields[1].replace('\\040', ' ')
+                if (path == mount or path.startswith(mount.rstrip('/') + '/')) and len(mount) > len(best):
+                    best, fstype = mount, fields[2]
+    except OSError:
+        pass
+    return fstype
+
+
+def is_remote(path):
+    """Vrai pour un montage FUSE (MTP, sshfs) ou réseau, où chaque accès coûte cher."""
+    return filesystem_type(path).startswith(REMOTE_FS)
+
+
+class DeviceScheduler:
+    """Exécute des tâches en parallèle en limitant le nombre de tâches par périphérique."""
+
+    def __init__(self, max_workers=4, per_device=1):
+        self.max_workers = max(1, max_workers)
+        self.per_device = max(1, per_device)
+        self._cond = threading.Condition()
+        self._busy = {}
+        self._running = 0
+
+    def _available(self, devices):
+        return all(self._busy.get(d, 0) < self.per_device for d in devices)
+
+    def _acquire(self, devices):
+        self._running += 1
+        for d in devices:
+            self._busy[d] = self._busy.get(d, 0) + 1
+
+    def _release(self, devices):
+        with self._cond:
+            self._running -= 1
+            for d in devices:
+                self._busy[d] -= 1
+            self._cond.notify_all()
+
+    def _run_job(self, devices, fn):
+        try:
+            fn()
+        finally:
+            self._release(devices)
+
+    def run(self, jobs):
+        """`jobs` : liste de (périphériques, fonction). Les tâches sont lancées dans l'ordre
+        dès que tous leurs périphériques ont une place libre."""
+        pending = [(frozenset(devices), fn) for devices, fn in jobs]
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            with self._cond:
+                while pending:
+                    job = None
+                    if self._running < self.max_workers:
+                        job = next((j for j in pending if self._available(j[0])), None)
+                    if job is None:
+                        self._cond.wait()
+                        continue
+                    pending.remove(job)
+                    self._acquire(job[0])
+                    futures.append(pool.submit(self._run_job, *job))
+        for future in futures:
+            future.result()
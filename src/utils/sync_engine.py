@@ -0,0 +1,425 @@
+import os
+from collections import deque
+from datetime import datetime
+from .compare import VERIFY_POLICIES, FileComparator, verify_blocks
+from .control import SyncCancelled, SyncControl
+from .copy_backend import CopyBackend
+from .fingerprint_index import FingerprintIndex
+from .hash_pool import HashPool
+from .hashing import DEFAULT_ALGORITHM, BlockDigest
+from .journal import new_run_id
+from .log_batcher import LogBatcher
+from .manifest import SourceManifest
+from .name_index import DestinationIndex
+from .pipeline import CopyPipeline, CopyTask
+from .progress import ProgressAggregator
+from .scanner import ScanEntry, scan_paths, scan_tree
+from .scheduler import DeviceScheduler, device_id
+
+PREFETCH_DEPTH = 512  # fichiers scannés d'avance pour alimenter le pool de hachage
+
+def _ignore(*args):
+    pass
+
+
+class SyncEngine:
+    """Logique de synchronisation, sans dépendance à Qt.
+
+    Les callbacks sont appelés depuis les threads de travail : on_progress(index,
+    Progress), on_overall_progress(Progress) et on_log_entries(liste d'entrées).
+
+    Chaque copie est hachée au passage (`algorithm`), sauf les copies par le noyau
+    sans vérification : leur empreinte est reprise de l'index si la source y est
+    connue, sinon calculée plus tard si une comparaison en a besoin. `verify`
+    ('none', 'sample' ou 'full') règle la relecture de contrôle après écriture.
+
+    `control` (SyncControl) permet de suspendre ou d'annuler la synchronisation ;
+    avec un `run_state` (RunState), les fichiers et mappings terminés sont notés
+    au fur et à mesure, et ceux déjà notés sont sautés.
+
+    Avec `hash_workers`, les fichiers à comparer sont hachés à l'avance par un
+    HashPool (threads ou processus selon `hash_pool`, 'auto' par défaut).
+
+    En mode `incremental`, les fichiers source inchangés (taille et date) depuis le
+    dernier passage complet du mapping ne sont ni comparés ni copiés.
+
+    `changes` ({indice du mapping: chemins relatifs, ou None pour tout le mapping})
+    limite la synchronisation aux chemins signalés par la surveillance.
+
+    `dry_run` (SyncPlan vide) analyse sans rien écrire : chaque fichier y est classé
+    (nouveau, identique, conflit renommé, inchangé). `plan` (SyncPlan rempli)
+    exécute ce classement sans rescanner ni recomparer.
+    """
+
+    def __init__(self, mappings, index_path=None, max_workers=4, per_device=1,
+                 readers=2, writers=1, queue_depth=8, journal=None, run_id=None,
+                 algorithm=DEFAULT_ALGORITHM, verify='none', control=None, run_state=None,
+                 hash_workers=0, hash_pool='auto', incremental=True, manifest_dir=None,
+                 changes=None, dry_run=None, plan=None,
+                 on_progress=None, on_overall_progress=None, on_log_entries=None):
+        if verify not in VERIFY_POLICIES:
+            raise ValueError(f"Politique de vérification inconnue: {verify}")
+        self.mappings = mappings
+        self.on_progress = on_progress or _ignore
+        self.on_overall_progress = on_overall_progress or _ignore
+        self.on_log_entries = on_log_entries or _ignore
+        # Une analyse n'est pas une synchronisation : rien dans le journal persistant
+        self.journal = journal if dry_run is None else None
+        self.run_id = run_id or new_run_id()
+        self.index_path = index_path
+        self.index = None
+        self.algorithm = algorithm
+        self.verify = verify
+        self.control = control or SyncControl()
+        self.run_state = run_state
+        self.hash_workers = hash_workers
+        self.hash_pool_kind = hash_pool
+        self.hash_pool = None
+        self.incremental = incremental
+        self.manifest_dir = manifest_dir
+        self.changes = changes
+        self.dry_run = dry_run
+        self.plan = plan
+        self.scheduler = DeviceScheduler(max_workers, per_device)
+        self.pipeline_options = {
+            'readers': readers,
+            'writers': writers,
+            'queue_depth': queue_depth,
+            # partagé entre les mappings : la méthode retenue par couple de volumes est mémorisée
+            'backend': CopyBackend(),
+            'new_digest': lambda: BlockDigest(algorithm),
+            'verify': self.verify_copy if verify != 'none' else None,
+            'check': self.control.check
+        }
+
+    def open_index(self):
+        try:
+            return FingerprintIndex(self.index_path)
+        except Exception as e:
+            print(f"Error opening fingerprint index: {e}")
+            return None
+
+    def run(self):
+        self.index = self.open_index()
+        if self.hash_workers:
+            self.hash_pool = HashPool(self.hash_workers, self.algorithm, self.hash_pool_kind, self.index)
+        self.tracker = ProgressAggregator(self.on_progress, self.on_overall_progress)
+        self.batcher = LogBatcher(self.emit_batch)
+        if self.journal is not None:
+            self.journal.start_run(self.run_id, len(self.mappings))
+        if self.plan is not None:
+            # Totaux connus d'avance : progression en octets exacte dès le départ
+            for idx in self.plan.files:
+                planned = self.plan.files[idx]
+                self.tracker.add_files(idx, len(planned), sum(f.entry.stat.st_size for f in planned))
+        try:
+            self.sync_all()
+        finally:
+            if self.hash_pool is not None:
+                self.hash_pool.close()
+                self.hash_pool = None
+            if self.index is not None:
+                self.index.close()
+                self.index = None
+            self.batcher.close()
+            if self.journal is not None:
+                self.journal.finish_run(self.run_id)
+            if self.run_state is not None and self.dry_run is None:
+                # L'état n'est gardé que si une reprise a encore quelque chose à faire
+                if all(self.run_state.is_completed(m) for m in self.mappings):
+                    self.run_state.clear()
+                else:
+                    self.run_state.close()
+        self.tracker.close('cancelled' if self.control.cancelled else 'completed')
+
+    def emit_batch(self, entries):
+        # Les lots du journal servent aussi d'écritures groupées sur disque
+        if self.journal is not None:
+            try:
+                self.journal.write(self.run_id, entries)
+            except Exception as e:
+                print(f"Error writing sync journal: {e}")
+        self.on_log_entries(entries)
+
+    def log(self, entry):
+        self.batcher.add(entry)
+
+    def verify_copy(self, task):
+        # On relit le fichier qui n'a pas servi au calcul de l'empreinte
+        other = task.destination if task.hashed == task.source else task.source
+        if not verify_blocks(other, task.digest, self.verify):
+            raise IOError(f"Vérification échouée, la copie diffère de la source: {task.destination}")
+
+    def remember_copy(self, task):
+        """Enregistre l'empreinte de la copie dans l'index et la renvoie (None si inconnue)."""
+        # Empreinte calculée pendant la copie : ni la source ni la copie ne seront relues
+        digest = task.digest.hexdigest() if task.digest is not None else None
+        if self.index is None:
+            return digest
+        try:
+            dst_st = os.stat(task.destination)
+            src_st = os.stat(task.source)
+        except OSError:
+            return digest
+        scanned = task.item.stat
+        unchanged = (src_st.st_size, src_st.st_mtime_ns) == (scanned.st_size, scanned.st_mtime_ns)
+        if digest is None:
+            # Copie par le noyau, non relue : l'empreinte déjà connue de la source vaut pour
+            # la copie ; sinon elle sera calculée à la première comparaison qui en aura besoin
+            if not unchanged or dst_st.st_size != src_st.st_size:
+                return None
+            digest = self.index.lookup(task.source, src_st, self.algorithm)
+            if digest is not None:
+                self.index.store(task.destination, dst_st, digest, self.algorithm)
+            return digest
+        self.index.store(task.destination, dst_st, digest, self.algorithm)
+        if unchanged and src_st.st_size == task.digest.size:
+            self.index.store(task.source, src_st, digest, self.algorithm)
+        return digest
+
+    def already_copied(self, comparator, names, src_path, dst_path, src_st):
+        """Chemin de la copie identique déjà présente à la destination, ou None."""
+        # Le contenu peut déjà exister sous une variante base_NNN d'un passage précédent ;
+        # les empreintes des variantes viennent de l'index, la plus récente est testée d'abord
+        for path in reversed(names.versions(dst_path)):
+            try:
+                if comparator.same_content(src_path, path, src_st=src_st):
+                    return path
+            except FileNotFoundError:
+                # Nom attribué pendant ce passage mais pas encore écrit
+                continue
+        return None
+
+    def sync_all(self):
+        # Les mappings sur des disques différents avancent en parallèle,
+        # ceux qui partagent un disque sont sérialisés pour éviter les allers-retours de tête
+        jobs = []
+        for idx, mapping in enumerate(self.mappings):
+            if self.changes is not None and idx not in self.changes:
+                continue
+            devices = {device_id(mapping.source), device_id(mapping.destination)}
+            jobs.append((devices, lambda idx=idx, mapping=mapping: self.sync_mapping(idx, mapping)))
+        self.scheduler.run(jobs)
+
+    def sync_mapping(self, idx, mapping):
+        control = self.control
+        try:
+            control.check()
+            if self.run_state is not None and self.run_state.is_completed(mapping):
+                # Terminé lors de la session interrompue : ni scan ni comparaison
+                self.tracker.start(idx)
+                self.tracker.finish(idx)
+                return
+            
+            if not os.path.exists(mapping.source):
+                raise FileNotFoundError(f"Le dossier source n'existe pas: {mapping.source}")
+            
+            if not os.path.exists(mapping.destination) and self.dry_run is None:
+                os.makedirs(mapping.destination, exist_ok=True)
+            
+            comparator = FileComparator(mapping.compare_mode, self.index, self.algorithm,
+                                        check=control.check, pool=self.hash_pool)
+            tracker = self.tracker
+            tracker.start(idx)
+            done = self.run_state.done_files(mapping) if self.run_state is not None else set()
+            manifest = SourceManifest(mapping, self.manifest_dir, load=self.incremental)
+            paths = self.changes.get(idx) if self.changes is not None else None
+            if paths is not None:
+                manifest.carry_over()
+            
+            names = DestinationIndex()  # chaque dossier de destination n'est listé qu'une fois
+            created_dirs = set()
+            actions = {}  # ScanEntry -> action prévue par le plan exécuté
+            
+            def planned_entries():
+                for planned in self.plan.entries(idx):
+                    control.check()
+                    entry = planned.entry
+                    if planned.action == 'skip':
+                        tracker.file_done(idx, entry.stat.st_size)
+                        mark_done(entry, manifest.destination(entry.relpath))
+                        continue
+                    if planned.action == 'identical':
+                        tracker.file_done(idx, entry.stat.st_size)
+                        mark_done(entry, relative(planned.destination))
+                        continue
+                    actions[entry] = planned.action
+                    yield entry
+            
+            def scan():
+                if self.plan is not None:
+                    yield from planned_entries()
+                    return
+                # Le total grandit au fil du parcours : la copie démarre sans attendre la fin du scan
+                if paths is None:
+                    entries = scan_tree(mapping.source, on_error=scan_error)
+                else:
+                    entries = scan_paths(mapping.source, paths, on_error=scan_error)
+                for entry in entries:
+                    control.check()
+                    tracker.add_file(idx, entry.stat.st_size)
+                    if entry.relpath in done or unchanged(entry):
+                        tracker.file_done(idx, entry.stat.st_size)
+                        manifest.record(entry, manifest.destination(entry.relpath))
+                        if self.dry_run is not None:
+                            self.dry_run.add(idx, entry, 'skip')
+                        continue
+                    yield entry
+            
+            def prefetch(entries):
+                # Le pool hache les fichiers en conflit pendant que les lecteurs traitent
+                # les PREFETCH_DEPTH fichiers précédents
+                ahead = deque()
+                for entry in entries:
+                    dst_path = os.path.join(mapping.destination, entry.relpath)
+                    if names.exists(dst_path):
+                        comparator.prefetch(entry.path, dst_path, entry.stat)
+                    ahead.append(entry)
+                    if len(ahead) > PREFETCH_DEPTH:
+                        yield ahead.popleft()
+                self.hash_pool.flush()
+                yield from ahead
+            
+            def scan_error(relpath, e):
+                tracker.add_file(idx, 0)
+                on_error(relpath, e)
+            
+            def relative(path):
+                return os.path.relpath(path, mapping.destination)
+            
+            def unchanged(entry):
+                # Source inchangée, et sa copie n'a pas été supprimée de la destination
+                # (listing du dossier mis en cache : pas de stat supplémentaire)
+                if not manifest.unchanged(entry):
+                    return False
+                return names.exists(os.path.join(mapping.destination, manifest.destination(entry.relpath)))
+            
+            def mark_done(entry, destination=None):
+                manifest.record(entry, destination)
+                if self.run_state is not None:
+                    self.run_state.mark_file(mapping, entry.relpath)
+            
+            def ensure_dir(path):
+                if path not in created_dirs and self.dry_run is None:
+                    os.makedirs(path, exist_ok=True)
+                    created_dirs.add(path)
+            
+            def prepare(entry):
+                control.check()
+                file = entry.relpath
+                src_path = entry.path
+                dst_path = os.path.join(mapping.destination, file)
+                ensure_dir(os.path.dirname(dst_path))
+                action = actions.pop(entry, None)
+                
+                if action != 'rename':
+                    if action == 'new' or not names.exists(dst_path):
+                        if names.claim(dst_path):
+                            return task(entry, dst_path, 'copied')
+                    else:
+                        matched = self.already_copied(comparator, names, src_path, dst_path, entry.stat)
+                        if matched is not None:
+                            tracker.file_done(idx, entry.stat.st_size)
+                            if self.dry_run is not None:
+                                self.dry_run.add(idx, entry, 'identical', matched)
+                            else:
+                                mark_done(entry, relative(matched))
+                            return None
+                
+                new_path = names.claim_next_version(dst_path)
+                return task(entry, new_path, 'renamed')
+            
+            def task(entry, dst_path, kind):
+                if self.dry_run is None:
+                    return CopyTask(entry, entry.path, dst_path, type=kind)
+                # Analyse : le nom est réservé en mémoire seulement, rien n'est copié
+                self.dry_run.add(idx, entry, 'new' if kind == 'copied' else 'rename', dst_path)
+                tracker.file_done(idx, entry.stat.st_size)
+                return None
+            
+            def on_bytes(task, n):
+                tracker.add_bytes(idx, n)
+            
+            def on_copied(task):
+                file = task.item.relpath
+                # La taille a pu changer depuis le scan : on recale le compte d'octets
+                tracker.file_done(idx, task.item.stat.st_size - task.written)
+                digest = self.remember_copy(task)
+                mark_done(task.item, relative(task.destination))
+                if task.info['type'] == 'renamed':
+                    self.log({
+                        'type': 'renamed',
+                        'original_name': file,
+                        'new_name': os.path.basename(task.destination),
+                        'source': task.source,
+                        'destination': task.destination,
+                        'method': task.method,
+                        'resumed_from': task.offset,
+                        'digest': digest,
+                        'algorithm': self.algorithm,
+                        'timestamp': datetime.now().isoformat()
+                    })
+                else:
+                    self.log({
+                        'type': 'copied',
+                        'name': file,
+                        'source': task.source,
+                        'destination': task.destination,
+                        'method': task.method,
+                        'resumed_from': task.offset,
+                        'digest': digest,
+                        'algorithm': self.algorithm,
+                        'timestamp': datetime.now().isoformat()
+                    })
+            
+            def on_error(item, e):
+                # item : chemin relatif (scan), ScanEntry (préparation) ou CopyTask (copie)
+                if isinstance(e, SyncCancelled):
+                    return
+                written = 0
+                if isinstance(item, CopyTask):
+                    written = item.written
+                    item = item.item
+                if isinstance(item, ScanEntry):
+                    tracker.file_done(idx, item.stat.st_size - written)
+                    item = item.relpath
+                else:
+                    tracker.file_done(idx)
+                if self.dry_run is not None:
+                    self.dry_run.add_error(idx, item, e)
+                self.log({
+                    'type': 'error',
+                    'file': item,
+                    'source': os.path.join(mapping.source, item),
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                })
+            
+            pipeline = CopyPipeline(prepare, on_copied, on_error, on_bytes=on_bytes,
+                                    **self.pipeline_options)
+            # Un plan exécuté ne compare plus rien : inutile de hacher à l'avance
+            prefetching = self.hash_pool is not None and self.plan is None
+            pipeline.run(prefetch(scan()) if prefetching else scan())
+            # Des fichiers ont pu être interrompus après la fin du scan
+            control.check()
+            
+            if self.dry_run is not None:
+                tracker.finish(idx)
+                return
+            manifest.save()
+            tracker.finish(idx)
+            if self.run_state is not None:
+                self.run_state.mark_completed(mapping)
+        
+        except SyncCancelled:
+            self.tracker.finish(idx, 'cancelled')
+        except Exception as e:
+            if self.dry_run is not None:
+                self.dry_run.add_error(idx, '', e)
+            self.log({
+                'type': 'error',
+                'source': mapping.source,
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            })
+            self.tracker.finish(idx, 'error')
@@ -1,101 +1,67 @@
-import os
-import shutil
-import zlib
-from datetime import datetime
+import asyncio
 from PyQt6.QtCore import QThread, pyqtSignal
+from ..models.events import LogEvent, OverallProgressEvent, ProgressEvent
 from ..models.folder_pair import Progress
+from .async_engine import AsyncSyncEngine
+from .control import SyncControl
+from .journal import new_run_id
+from .sync_engine import SyncEngine
+from .watcher import SyncWatcher
 
 class SyncWorker(QThread):
     progress = pyqtSignal(int, Progress)  # mapping_index, progress
-    log_entry = pyqtSignal(dict)
+    overall_progress = pyqtSignal(Progress)
+    log_entries = pyqtSignal(list)  # entrées regroupées par lots
     finished = pyqtSignal()
 
-    def __init__(self, mappings):
+    def __init__(self, mappings, **options):
         super().__init__()
         self.mappings = mappings
+        self.run_id = options.setdefault('run_id', new_run_id())
+        self.control = options.setdefault('control', SyncControl())
+        self.engine = AsyncSyncEngine(**options)
 
-    def calculate_crc32(self, filepath):
-        try:
-            with open(filepath, 'rb') as f:
-                return format(zlib.crc32(f.read()) & 0xFFFFFFFF, '08x')
-        except Exception as e:
-            print(f"Error calculating CRC for {filepath}: {e}")
-            return None
+    def run(self):
+        asyncio.run(self.relay())
+        self.finished.emit()
+
+    async def relay(self):
+        # Traduit les événements du moteur en signaux Qt
+        async for event in self.engine.sync(self.mappings):
+            if isinstance(event, ProgressEvent):
+                self.progress.emit(event.index, event.progress)
+            elif isinstance(event, OverallProgressEvent):
+                self.overall_progress.emit(event.progress)
+            elif isinstance(event, LogEvent):
+                self.log_entries.emit(event.entries)
+
+
+class WatchWorker(QThread):
+    progress = pyqtSignal(int, Progress)
+    overall_progress = pyqtSignal(Progress)
+    log_entries = pyqtSignal(list)
+    finished = pyqtSignal()
+
+    def __init__(self, mappings, **options):
+        super().__init__()
+        self.mappings = mappings
+        self.options = options
+        self.control = SyncControl()
+        self.watcher = SyncWatcher(mappings, self.control)
+
+    def sync(self, changes=None):
+        SyncEngine(self.mappings, control=self.control, changes=changes,
+                   on_progress=self.progress.emit,
+                   on_overall_progress=self.overall_progress.emit,
+                   on_log_entries=self.log_entries.emit, **self.options).run()
 
     def run(self):
-        for idx, mapping in enumerate(self.mappings):
-            try:
-                if not os.path.exists(mapping.source):
-                    raise FileNotFoundError(f"Le dossier source n'existe pas: {mapping.source}")
-                
-                if not os.path.exists(mapping.destination):
-                    os.makedirs(mapping.destination)
-                
-                files = [f for f in os.listdir(mapping.source) 
-                        if os.path.isfile(os.path.join(mapping.source, f))]
-                
-                progress = Progress(0, len(files), 'syncing')
-                self.progress.emit(idx, progress)
-                
-                for i, file in enumerate(files):
-                    src_path = os.path.join(mapping.source, file)
-                    dst_path = os.path.join(mapping.destination, file)
-                    
-                    try:
-                        if os.path.exists(dst_path):
-                            src_crc = self.calculate_crc32(src_path)
-                            dst_crc = self.calculate_crc32(dst_path)
-                            
-                            if src_crc != dst_crc:
-                                base, ext = os.path.splitext(file)
-                                counter = 1
-                                while os.path.exists(dst_path):
-                                    new_name = f"{base}_{counter:03d}{ext}"
-                                    dst_path = os.path.join(mapping.destination, new_name)
-                                    counter += 1
-                                
-                                shutil.copy2(src_path, dst_path)
-                                self.log_entry.emit({
-                                    'type': 'renamed',
-                                    'original_name': file,
-                                    'new_name': os.path.basename(dst_path),
-                                    'source': src_path,
-                                    'destination': dst_path,
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                        else:
-                            shutil.copy2(src_path, dst_path)
-                            self.log_entry.emit({
-                                'type': 'copied',
-                                'name': file,
-                                'source': src_path,
-                                'destination': dst_path,
-                                'timestamp': datetime.now().isoformat()
-                            })
-                        
-                        progress.current = i + 1
-                        self.progress.emit(idx, progress)
-                        
-                    except Exception as e:
-                        self.log_entry.emit({
-                            'type': 'error',
-                            'file': file,
-                            'source': src_path,
-                            'error': str(e),
-                            'timestamp': datetime.now().isoformat()
-                        })
-                
-                progress.status = 'completed'
-                self.progress.emit(idx, progress)
-                        
-            except Exception as e:
-                self.log_entry.emit({
-                    'type': 'error',
-                    'source': mapping.source,
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
-                progress = Progress(0, 1, 'error')
-                self.progress.emit(idx, progress)
-        
-        self.finished.emit()
\ No newline at end of file
+        # Rattrapage initial, puis un passage limité aux chemins modifiés par rafale
+        self.watcher.start()
+        try:
+            self.sync()
+            for changes in self.watcher.batches():
+                self.sync(changes)
+        finally:
+            self.watcher.stop()
+        self.finished.emit()
@@ -0,0 +1,304 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from .scheduler import is_remote
+
+DEBOUNCE = 2.0  # secondes sans nouvel événement avant de lancer la synchronisation
+MAX_DELAY = 30.0  # au-delà, on synchronise même si les événements continuent
+POLL_INTERVAL = 10.0
+POLL_BACKOFF = 10  # intervalle d'au moins 10 fois la durée d'un relevé
+FULL_SCAN = None  # à la place d'un ensemble de chemins : tout le mapping est à rescanner
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT = struct.Struct('iIII')
+
+
+def _libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+    return libc
+
+
+_LIBC = _libc()
+
+
+def uses_inotify(path):
+    # Les montages FUSE/MTP ou réseau n'émettent pas (ou mal) d'événements inotify
+    return _LIBC is not None and not is_remote(path)
+
+
+class _Inotify:
+    def __init__(self, root):
+        self.root = root
+        self.fd = _LIBC.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs = {}  # wd -> chemin relatif du dossier surveillé
+
+    def add_tree(self, relpath):
+        """Surveille `relpath` et ses sous-dossiers ; renvoie les fichiers déjà présents."""
+        found = []
+        pending = [relpath]
+        while pending:
+            rel = pending.pop()
+            path = os.path.join(self.root, rel) if rel else self.root
+            wd = _LIBC.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                continue
+            self.dirs[wd] = rel
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        child = os.path.join(rel, entry.name) if rel else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(child)
+                        else:
+                            found.append(child)
+            except OSError:
+                continue
+        return found
+
+    def read(self, timeout):
+        """Chemins relatifs modifiés (FULL_SCAN si la file du noyau a débordé)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            raw = data[offset + _EVENT.size:offset + _EVENT.size + length]
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return [FULL_SCAN]
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None:
+                continue
+            name = os.fsdecode(raw.rstrip(b'\0'))
+            relpath = os.path.join(parent, name) if parent else name
+            if mask & IN_ISDIR:
+                # Nouveau dossier : ses fichiers ont pu être créés avant la mise sous surveillance
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.extend(self.add_tree(relpath))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.append(relpath)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _watch_inotify(idx, root, emit, stop):
+    notify = _Inotify(root)
+    try:
+        notify.add_tree('')
+        while not stop.is_set():
+            for relpath in notify.read(0.5):
+                emit(idx, relpath)
+    finally:
+        notify.close()
+
+
+class _DirectoryPoller:
+    """Repère les nouveaux fichiers en ne relevant que la date des dossiers.
+
+    Un dossier n'est relu que si sa date a changé (fichier créé, renommé ou
+    supprimé) : un passage coûte un stat par dossier au lieu d'un par fichier.
+    Un fichier apparu n'est signalé qu'une fois sa taille et sa date inchangées
+    d'un passage au suivant : une copie encore en cours ne part pas tronquée.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dirs = {}  # dossier relatif -> (mtime_ns, noms de fichiers, sous-dossiers)
+        self.unsettled = {}  # fichiers récents -> (taille, mtime_ns) au dernier passage
+        self._walk('', False)
+
+    def _path(self, rel):
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _list(self, rel):
+        path = self._path(rel)
+        files, subdirs = {}, set()
+        mtime = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            for entry in it:
+                child = os.path.join(rel, entry.name) if rel else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.add(child)
+                else:
+                    files[child] = entry
+        return mtime, files, subdirs
+
+    def _walk(self, rel, track):
+        # Nouveau dossier : tous ses fichiers sont à suivre
+        pending = [rel]
+        while pending:
+            rel = pending.pop()
+            try:
+                mtime, files, subdirs = self._list(rel)
+            except OSError:
+                continue
+            self.dirs[rel] = (mtime, set(files), subdirs)
+            pending.extend(subdirs)
+            if track:
+                for relpath, entry in files.items():
+                    self._track(relpath, entry)
+
+    def _track(self, relpath, entry):
+        try:
+            st = entry.stat()
+        except OSError:
+            return
+        self.unsettled[relpath] = (st.st_size, st.st_mtime_ns)
+
+    def _forget(self, rel):
+        for directory in [d for d in self.dirs if d == rel or d.startswith(rel + os.sep)]:
+            del self.dirs[directory]
+
+    def poll(self):
+        changed = []
+        for relpath, state in list(self.unsettled.items()):
+            try:
+                st = os.stat(self._path(relpath))
+            except OSError:
+                del self.unsettled[relpath]
+                continue
+            if (st.st_size, st.st_mtime_ns) == state:
+                del self.unsettled[relpath]
+                changed.append(relpath)
+            else:
+                self.unsettled[relpath] = (st.st_size, st.st_mtime_ns)
+        for rel in list(self.dirs):
+            if rel not in self.dirs:
+                continue  # sous-dossier d'un dossier supprimé pendant ce passage
+            mtime, names, subdirs = self.dirs[rel]
+            try:
+                if os.stat(self._path(rel)).st_mtime_ns == mtime:
+                    continue
+                mtime, files, current = self._list(rel)
+            except OSError:
+                self._forget(rel)
+                continue
+            self.dirs[rel] = (mtime, set(files), current)
+            for relpath, entry in files.items():
+                if relpath not in names:
+                    self._track(relpath, entry)
+            for subdir in subdirs - current:
+                self._forget(subdir)
+            for subdir in current - subdirs:
+                self._walk(subdir, True)
+        return changed
+
+
+def _watch_polling(idx, root, emit, stop, interval):
+    start = time.monotonic()
+    poller = _DirectoryPoller(root)
+    wait = max(interval, (time.monotonic() - start) * POLL_BACKOFF)
+    while not stop.wait(wait):
+        start = time.monotonic()
+        for relpath in poller.poll():
+            emit(idx, relpath)
+        # Sur un montage lent, le relevé occupe lui-même le lien avec le téléphone :
+        # l'intervalle s'allonge pour qu'il n'en prenne pas plus de 1/POLL_BACKOFF
+        wait = max(interval, (time.monotonic() - start) * POLL_BACKOFF)
+
+
+class SyncWatcher:
+    """Surveille les dossiers source et regroupe les changements par rafales.
+
+    inotify sous Linux ; ailleurs, et pour les montages FUSE/MTP ou réseau qui
+    n'émettent pas d'événements, relevé périodique de la date des dossiers.
+    `batches()` renvoie des dictionnaires {indice du mapping: chemins relatifs
+    modifiés, ou FULL_SCAN} une fois que les événements se sont calmés pendant
+    `debounce` secondes.
+    """
+
+    def __init__(self, mappings, control, debounce=DEBOUNCE, max_delay=MAX_DELAY,
+                 poll_interval=POLL_INTERVAL):
+        self.mappings = mappings
+        self.control = control
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.methods = {}  # indice -> 'inotify' ou 'polling'
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _emit(self, idx, relpath):
+        self._events.put((idx, relpath))
+
+    def _run_source(self, idx, root):
+        try:
+            if self.methods[idx] == 'inotify':
+                _watch_inotify(idx, root, self._emit, self._stop)
+            else:
+                _watch_polling(idx, root, self._emit, self._stop, self.poll_interval)
+        except OSError as e:
+            print(f"Error watching {root}: {e}")
+
+    def start(self):
+        for idx, mapping in enumerate(self.mappings):
+            self.methods[idx] = 'inotify' if uses_inotify(mapping.source) else 'polling'
+            t = threading.Thread(target=self._run_source, args=(idx, mapping.source), daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def batches(self):
+        pending = {}
+        first = last = 0.0
+        while not self.control.cancelled:
+            timeout = 0.5  # réveil régulier pour voir une annulation
+            if pending:
+                deadline = min(last + self.debounce, first + self.max_delay)
+                timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+            try:
+                idx, relpath = self._events.get(timeout=timeout)
+            except queue.Empty:
+                if pending and not self.control.paused and \
+                        time.monotonic() >= min(last + self.debounce, first + self.max_delay):
+                    yield pending
+                    pending = {}
+                continue
+            now = time.monotonic()
+            if not pending:
+                first = now
+            last = now
+            if relpath is FULL_SCAN:
+                pending[idx] = FULL_SCAN
+            elif pending.get(idx, set()) is not FULL_SCAN:
+                pending.setdefault(idx, set()).add(relpath)
@@ -1,6 +1,16 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
-    QLabel, QLineEdit, QPushButton, QProgressBar, QFileDialog)
-from ..models.folder_pair import FolderPair, Progress
+    QLabel, QLineEdit, QPushButton, QProgressBar, QFileDialog, QComboBox)
+from ..models.folder_pair import FolderPair, Progress, DEFAULT_COMPARE_MODE
+from ..utils.progress import format_progress
+
+PROGRESS_SCALE = 1000  # les octets dépassent la capacité d'un int Qt : on affiche des pour-mille
+
+COMPARE_MODE_LABELS = {
+    'tiered': "Rapide puis empreinte (recommandé)",
+    'quick': "Taille et date seulement",
+    'hash': "Empreinte complète",
+    'direct': "Comparaison octet par octet"
+}
 
 class FolderPairWidget(QWidget):
     def __init__(self, parent=None):
@@ -82,6 +92,18 @@ class FolderPairWidget(QWidget):
         
         layout.addLayout(paths_layout)
         
+        # Mode de comparaison des fichiers existants
+        compare_layout = QHBoxLayout()
+        compare_label = QLabel("Comparaison:")
+        compare_label.setStyleSheet("font-weight: bold;")
+        self.compare_combo = QComboBox()
+        for mode, label in COMPARE_MODE_LABELS.items():
+            self.compare_combo.addItem(label, mode)
+        compare_layout.addWidget(compare_label)
+        compare_layout.addWidget(self.compare_combo)
+        compare_layout.addStretch()
+        layout.addLayout(compare_layout)
+        
         # Barre de progression
         self.progress = QProgressBar()
         self.progress.setFormat("%v/%m fichiers (%p%)")
@@ -97,16 +119,18 @@ class FolderPairWidget(QWidget):
     def get_mapping(self) -> FolderPair:
         return FolderPair(
             source=self.source_edit.text(),
-            destination=self.dest_edit.text()
+            destination=self.dest_edit.text(),
+            compare_mode=self.compare_combo.currentData() or DEFAULT_COMPARE_MODE
         )
     
     def set_mapping(self, mapping: FolderPair):
         self.source_edit.setText(mapping.source)
         self.dest_edit.setText(mapping.destination)
+        index = self.compare_combo.findData(mapping.compare_mode)
+        self.compare_combo.setCurrentIndex(max(index, 0))
     
     def update_progress(self, progress: Progress):
-        self.progress.setMaximum(progress.total)
-        self.progress.setValue(progress.current)
+        update_progress_bar(self.progress, progress)
         
         if progress.status == 'error':
             self.progress.setStyleSheet("""
@@ -119,4 +143,20 @@ class FolderPairWidget(QWidget):
                 QProgressBar::chunk {
                     background-color: #28a745;
                 }
-            """)
\ No newline at end of file
+            """)
+        elif progress.status == 'cancelled':
+            self.progress.setStyleSheet("""
+                QProgressBar::chunk {
+                    background-color: #6c757d;
+                }
+            """)
+
+
+def update_progress_bar(bar, progress: Progress):
+    if progress.bytes_total:
+        bar.setMaximum(PROGRESS_SCALE)
+        bar.setValue(min(progress.bytes_done * PROGRESS_SCALE // progress.bytes_total, PROGRESS_SCALE))
+    else:
+        bar.setMaximum(max(progress.total, 1))
+        bar.setValue(progress.current)
+    bar.setFormat(format_progress(progress) + " (%p%)")
@@ -1,28 +1,96 @@
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+    QTableView, QComboBox, QLineEdit, QLabel, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import QTimer
 from datetime import datetime
+from itertools import islice
+from ..utils.log_store import LogStore, MAX_IN_MEMORY
+from .log_model import LogTableModel
+
+TYPE_FILTERS = [
+    ("Tous", None),
+    ("Copiés", {'copied'}),
+    ("Renommés", {'renamed'}),
+    ("Erreurs", {'error'})
+]
+ALL_RUNS = '*'
+LOAD_CHUNK = 1000  # entrées de l'historique chargées entre deux événements de l'interface
 
 class LogDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, max_in_memory=MAX_IN_MEMORY, journal=None):
         super().__init__(parent)
         self.setWindowTitle("Journal de synchronisation")
         self.setMinimumSize(800, 600)
+        self.journal = journal
+        # Session en cours et historique ont chacun leur modèle
+        self.live_model = LogTableModel(LogStore(max_in_memory), self)
+        self.history_model = LogTableModel(LogStore(max_in_memory), self)
+        self.model = self.live_model
+        self.loading = None  # entrées de l'historique restant à charger
         self.init_ui()
         
     def init_ui(self):
         layout = QVBoxLayout()
         
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setStyleSheet("""
-            QTextEdit {
+        # Historique (chargé à la demande depuis le journal persistant)
+        if self.journal is not None:
+            history_layout = QHBoxLayout()
+            self.run_combo = QComboBox()
+            self.run_combo.addItem("Session en cours", None)
+            self.run_combo.currentIndexChanged.connect(self.select_run)
+            history_button = QPushButton("Charger l'historique")
+            history_button.clicked.connect(self.refresh_runs)
+            history_layout.addWidget(self.run_combo, 1)
+            history_layout.addWidget(history_button)
+            layout.addLayout(history_layout)
+        
+        # Filtres
+        filters_layout = QHBoxLayout()
+        self.type_combo = QComboBox()
+        for label, _ in TYPE_FILTERS:
+            self.type_combo.addItem(label)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Rechercher un fichier, un dossier, une erreur...")
+        self.count_label = QLabel()
+        filters_layout.addWidget(self.type_combo)
+        filters_layout.addWidget(self.search_edit)
+        filters_layout.addWidget(self.count_label)
+        layout.addLayout(filters_layout)
+        
+        # La recherche n'est relancée qu'une fois la saisie terminée
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.apply_filter)
+        self.search_edit.textChanged.connect(lambda _: self.search_timer.start())
+        self.type_combo.currentIndexChanged.connect(self.apply_filter)
+        
+        # L'historique complet peut peser des centaines de Mo : il est chargé par tranches,
+        # le tableau s'affiche tout de suite et se remplit sans bloquer la fenêtre
+        self.load_timer = QTimer(self)
+        self.load_timer.setInterval(0)
+        self.load_timer.timeout.connect(self.load_more)
+        
+        # Tableau virtualisé : seules les lignes visibles sont lues dans le store
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for column, width in enumerate((140, 80, 220, 260)):
+            self.table.setColumnWidth(column, width)
+        self.table.setStyleSheet("""
+            QTableView {
                 background-color: #f8f9fa;
                 border: 1px solid #dee2e6;
                 border-radius: 4px;
-                padding: 8px;
                 font-family: monospace;
             }
         """)
-        layout.addWidget(self.log_text)
+        layout.addWidget(self.table)
         
         close_button = QPushButton("Fermer")
         close_button.setStyleSheet("""
@@ -41,21 +109,61 @@ class LogDialog(QDialog):
         layout.addWidget(close_button)
         
         self.setLayout(layout)
-        
-    def add_log(self, entry):
-        timestamp = datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-        html = f"<p><strong>[{timestamp}]</strong> "
-        
-        if entry['type'] == 'error':
-            html += f'<span style="color: #dc3545;">ERREUR: {entry["error"]}</span>'
-        elif entry['type'] == 'renamed':
-            html += f'<span style="color: #ffc107;">Renommé: {entry["original_name"]} → {entry["new_name"]}</span>'
+        self.update_count()
+    
+    def refresh_runs(self):
+        self.run_combo.blockSignals(True)
+        self.run_combo.clear()
+        self.run_combo.addItem("Session en cours", None)
+        for run in self.journal.runs():
+            started = datetime.fromisoformat(run['started']).strftime('%d/%m/%Y %H:%M:%S')
+            state = "" if run['finished'] else " (interrompue)"
+            self.run_combo.addItem(f"Session du {started}{state}", run['run_id'])
+        self.run_combo.addItem("Tout l'historique", ALL_RUNS)
+        self.run_combo.blockSignals(False)
+    
+    def select_run(self):
+        self.stop_loading()
+        run_id = self.run_combo.currentData()
+        if run_id is None:
+            self.model = self.live_model
         else:
-            html += f'<span style="color: #28a745;">Copié: {entry["name"]}</span>'
+            self.model = self.history_model
+            self.model.clear()
+            self.loading = self.journal.query(run_id=None if run_id == ALL_RUNS else run_id)
+            self.load_timer.start()
+        self.table.setModel(self.model)
+        self.apply_filter()
+    
+    def load_more(self):
+        chunk = list(islice(self.loading, LOAD_CHUNK))
+        if chunk:
+            self.history_model.add_entries(chunk)
+        if len(chunk) < LOAD_CHUNK:
+            self.stop_loading()
+        if self.model is self.history_model:
+            self.update_count()
+    
+    def stop_loading(self):
+        self.load_timer.stop()
+        if self.loading is not None:
+            # Ferme la connexion SQLite restée ouverte dans le générateur
+            self.loading.close()
+            self.loading = None
+    
+    def apply_filter(self):
+        types = TYPE_FILTERS[self.type_combo.currentIndex()][1]
+        self.model.set_filter(types, self.search_edit.text().strip())
+        self.update_count()
+    
+    def update_count(self):
+        loading = " (chargement...)" if self.loading is not None and self.model is self.history_model else ""
+        self.count_label.setText(f"{self.model.rowCount()} / {len(self.model.store)} entrées{loading}")
         
-        html += f'<br><span style="color: #6c757d;">Source: {entry["source"]}</span>'
-        if 'destination' in entry:
-            html += f'<br><span style="color: #6c757d;">Destination: {entry["destination"]}</span>'
-        
-        html += "</p>"
-        self.log_text.append(html)
\ No newline at end of file
+    def add_log(self, entry):
+        self.add_logs([entry])
+    
+    def add_logs(self, entries):
+        self.live_model.add_entries(entries)
+        if self.model is self.live_model:
+            self.update_count()
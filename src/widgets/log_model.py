@@ -0,0 +1,95 @@
+from datetime import datetime
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+from ..utils.log_store import LogStore
+
+TYPE_LABELS = {
+    'copied': "Copié",
+    'renamed': "Renommé",
+    'error': "Erreur"
+}
+TYPE_COLORS = {
+    'copied': QColor('#28a745'),
+    'renamed': QColor('#d39e00'),
+    'error': QColor('#dc3545')
+}
+
+class LogTableModel(QAbstractTableModel):
+    COLUMNS = ("Date", "Type", "Fichier", "Source", "Destination / Erreur")
+
+    def __init__(self, store: LogStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.rows = None  # None : pas de filtre, sinon numéros de lignes du store
+        self.types = None
+        self.text = ''
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store) if self.rows is None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def store_row(self, row):
+        return row if self.rows is None else self.rows[row]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.store_row(index.row())
+        column = index.column()
+        
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            timestamp, _, name, detail, source, destination = self.store.row(row)
+            entry_type = self.store.entry_type(row)
+            if column == 0:
+                return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            if column == 1:
+                return TYPE_LABELS.get(entry_type, entry_type)
+            if column == 2:
+                return f"{name} → {detail}" if entry_type == 'renamed' else name
+            if column == 3:
+                return source
+            return detail if entry_type == 'error' else destination
+        
+        if role == Qt.ItemDataRole.ForegroundRole and column in (1, 2):
+            return TYPE_COLORS.get(self.store.entry_type(row))
+        return None
+
+    def add_entries(self, entries):
+        first = len(self.store)
+        self.store.extend(entries)
+        new_rows = range(first, len(self.store))
+        if self.rows is not None:
+            new_rows = [r for r in new_rows if self.store.matches(r, self.types, self.text)]
+        if not new_rows:
+            return
+        start = self.rowCount()
+        self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+        if self.rows is not None:
+            self.rows.extend(new_rows)
+        self.endInsertRows()
+
+    def set_filter(self, types=None, text=''):
+        self.beginResetModel()
+        self.types = types
+        self.text = text.lower()
+        if types is None and not text:
+            self.rows = None
+        else:
+            self.rows = self.store.find(types, text)
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        if self.rows is not None:
+            self.rows = self.rows[:0]
+        self.endResetModel()